@@ -2,16 +2,22 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import io
+import os
+import tempfile
 from datetime import datetime
-import matplotlib.pyplot as plt
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Image
-import time
 
-from app_pages.prediction import load_assets, preprocess_input
+from utils.ui import StageProgress
+from src.explanations import explain_frame
+from src.pdf_report import write_batch_report
+from src.charts import (
+    DENSITY_MIN_ROWS, amount_hist_png, correlation_png, fraud_counts_png, gauge_png, pdf_image,
+    probability_hist_png, shap_bar_png, timeline_png
+)
+from src.pipeline_cache import PipelineCache, content_key
+from src.batch_stats import BatchStats
+from src.tree_engine import CompiledForest
+from src.scoring import DEFAULT_THRESHOLD, model_version, preprocess_input, score
+from app_pages.prediction import get_explainer, get_shap_cache, load_assets
 
 st.markdown("""
     <style>
@@ -52,9 +58,125 @@ st.markdown("""
 def cached_assets():
     return load_assets()
 
-@st.cache_data
-def read_csv_file(file):
-    return pd.read_csv(file)
+REQUIRED_COLS = [
+    "TX_AMOUNT", "TX_TIME_SECONDS", "TX_TIME_DAYS",
+    "TX_HOUR", "TX_WEEKDAY", "TX_MONTH", "IS_WEEKEND",
+    "TX_AMOUNT_BIN", "TX_COUNT"
+]
+
+FILL_DEFAULTS = {
+    "TX_AMOUNT": 0,
+    "TX_TIME_SECONDS": 0,
+    "TX_TIME_DAYS": 0,
+    "TX_HOUR": 0,
+    "TX_WEEKDAY": 0,
+    "TX_MONTH": 1,
+    "IS_WEEKEND": 0,
+    "TX_AMOUNT_BIN": "Unknown",
+    "TX_COUNT": 0
+}
+
+# Rows read, preprocessed and scored at a time; bounds peak memory for large uploads.
+CHUNK_ROWS = 100_000
+BASE_DATE = pd.Timestamp("2020-01-01")
+# Threads a batch explanation is split across (see explanations.explain_frame).
+SHAP_WORKERS = os.cpu_count() or 1
+
+class MissingColumnsError(ValueError):
+    def __init__(self, missing_cols):
+        self.missing_cols = missing_cols
+        super().__init__(f"Missing required columns: {', '.join(missing_cols)}")
+
+def score_csv_in_chunks(file, model, encoders, out_path, threshold=DEFAULT_THRESHOLD,
+                        chunk_rows=CHUNK_ROWS, on_progress=None, stats=None):
+    """Read, preprocess and score a CSV chunk by chunk, streaming results to `out_path`.
+
+    Returns (results_df, features_df, had_missing_values). `results_df` only
+    holds the compact result columns, never the raw upload; `features_df` is
+    the encoded model input as float32, which is what the forest sees. When
+    a BatchStats is passed, each result chunk is folded into it as it is scored.
+    """
+    total_bytes = getattr(file, "size", 0) or 0
+    if hasattr(file, "seek"):
+        file.seek(0)
+    parts = []
+    feature_parts = []
+    had_missing = False
+    rows_done = 0
+
+    for i, chunk in enumerate(pd.read_csv(file, chunksize=chunk_rows)):
+        if i == 0:
+            missing_cols = [col for col in REQUIRED_COLS if col not in chunk.columns]
+            if missing_cols:
+                raise MissingColumnsError(missing_cols)
+
+        if chunk.isnull().values.any():
+            had_missing = True
+            chunk = chunk.fillna(FILL_DEFAULTS)
+
+        processed = preprocess_input(chunk, encoders)
+        proba, preds = score(model, processed, threshold)
+
+        part = pd.DataFrame({
+            "TX_AMOUNT": chunk["TX_AMOUNT"].to_numpy(),
+            "TX_HOUR": chunk["TX_HOUR"].to_numpy(),
+            "TX_WEEKDAY": chunk["TX_WEEKDAY"].to_numpy(),
+            "fraud_probability": proba,
+            "prediction": preds,
+            "prediction_label": np.where(preds == 1, "Fraud", "Not Fraud"),
+            "TX_DATETIME": (
+                BASE_DATE
+                # Non-numeric offsets only score as unknown codes; show them as NaT.
+                + pd.to_timedelta(pd.to_numeric(chunk["TX_TIME_DAYS"], errors="coerce").to_numpy(), unit="D")
+                + pd.to_timedelta(pd.to_numeric(chunk["TX_TIME_SECONDS"], errors="coerce").to_numpy(), unit="s")
+            ),
+        })
+        if "CUSTOMER_ID" in chunk.columns:
+            part["CUSTOMER_ID"] = chunk["CUSTOMER_ID"].to_numpy()
+
+        part.to_csv(out_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        if stats is not None:
+            # Row positions in the full upload, matching results_df's index.
+            stats.update(part.set_axis(pd.RangeIndex(rows_done, rows_done + len(part))))
+        parts.append(part)
+        feature_parts.append(processed.astype(np.float32))
+        rows_done += len(chunk)
+
+        if on_progress is not None:
+            done = file.tell() / total_bytes if total_bytes else 0.0
+            on_progress(min(done, 1.0), rows_done)
+
+    if not parts:
+        raise ValueError("The uploaded file contains no rows.")
+
+    features_df = pd.concat(feature_parts, ignore_index=True)
+    return pd.concat(parts, ignore_index=True), features_df, had_missing
+
+def _session_file(key: str, suffix: str) -> str:
+    """One on-disk file per session and key, replaced on each new run."""
+    old_path = st.session_state.get(key)
+    if old_path and os.path.exists(old_path):
+        os.remove(old_path)
+    fd, path = tempfile.mkstemp(prefix="fraud_batch_", suffix=suffix)
+    os.close(fd)
+    st.session_state[key] = path
+    return path
+
+def _new_results_path() -> str:
+    fd, path = tempfile.mkstemp(prefix="fraud_batch_", suffix=".csv")
+    os.close(fd)
+    return path
+
+def _evict_stage(stage, value):
+    # A scored upload owns its on-disk results CSV.
+    if stage == "scores" and os.path.exists(value["results_path"]):
+        os.remove(value["results_path"])
+
+def _pipeline_cache() -> PipelineCache:
+    """Per-session cache of scored uploads and their KPI summaries."""
+    if "batch_pipeline_cache" not in st.session_state:
+        st.session_state["batch_pipeline_cache"] = PipelineCache(on_evict=_evict_stage)
+    return st.session_state["batch_pipeline_cache"]
 
 def get_template_df():
     return pd.DataFrame([
@@ -66,109 +188,12 @@ def get_template_df():
          "TX_AMOUNT_BIN": "1000-5000", "TX_COUNT": 25}
     ])
 
-def generate_pdf_with_charts(results_df):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # --- Report title & timestamp ---
-    elements.append(Paragraph("Batch Fraud Prediction Report", styles["Title"]))
-    report_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    elements.append(Paragraph(f"Report Generated On: {report_date}", styles["Normal"]))
-    elements.append(Spacer(1, 12))
-
-    # --- Compute TX_DATETIME if time columns exist ---
-    if "TX_TIME_DAYS" in results_df.columns and "TX_TIME_SECONDS" in results_df.columns:
-        base_date = pd.Timestamp("2020-01-01") 
-        results_df["TX_DATETIME"] = (
-            base_date
-            + pd.to_timedelta(results_df["TX_TIME_DAYS"], unit="D")
-            + pd.to_timedelta(results_df["TX_TIME_SECONDS"], unit="s")
-        )
-    else:
-        results_df["TX_DATETIME"] = None
-
-    # --- Fraud Pattern Statistics ---
-    fraud_df = results_df[results_df["prediction_label"] == "Fraud"]
-
-    fraud_rate = len(fraud_df) / len(results_df) if len(results_df) > 0 else 0
-    avg_fraud_amount = fraud_df["TX_AMOUNT"].mean() if not fraud_df.empty else 0
-    common_hour = fraud_df["TX_HOUR"].mode()[0] if "TX_HOUR" in fraud_df.columns and not fraud_df.empty else "-"
-    common_day = fraud_df["TX_WEEKDAY"].mode()[0] if "TX_WEEKDAY" in fraud_df.columns and not fraud_df.empty else "-"
-
-    kpi_data = [
-        ["Metric", "Value"],
-        ["% Fraudulent Transactions", f"{fraud_rate:.2%}"],
-        ["Average Fraud Amount", f"${avg_fraud_amount:,.2f}"],
-        ["Most Common Fraud Hour", common_hour],
-        ["Most Common Fraud Day (0=Mon)", common_day]
-    ]
-
-    kpi_table = Table(kpi_data)
-    kpi_table.setStyle(TableStyle([
-        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER")
-    ]))
-    elements.append(kpi_table)
-    elements.append(Spacer(1, 12))
-
-    # --- Fraud Count Chart ---
-    count_buf = io.BytesIO()
-    counts = results_df["prediction_label"].value_counts()
-    fig, ax = plt.subplots(figsize=(4, 3))
-    ax.bar(counts.index, counts.values, color=["red", "green"])
-    ax.set_ylabel("Count")
-    ax.set_title("Fraud vs Non-Fraud")
-    plt.tight_layout()
-    plt.savefig(count_buf, format="png")
-    plt.close(fig)
-    count_buf.seek(0)
-    elements.append(Image(count_buf, width=300, height=200))
-    elements.append(Spacer(1, 12))
-
-    # --- Probability Distribution Chart ---
-    prob_buf = io.BytesIO()
-    fig2, ax2 = plt.subplots(figsize=(4, 3))
-    ax2.hist(results_df["fraud_probability"], bins=20, color="blue", alpha=0.7)
-    ax2.set_xlabel("Fraud Probability")
-    ax2.set_ylabel("Frequency")
-    ax2.set_title("Fraud Probability Distribution")
-    plt.tight_layout()
-    plt.savefig(prob_buf, format="png")
-    plt.close(fig2)
-    prob_buf.seek(0)
-    elements.append(Image(prob_buf, width=300, height=200))
-    elements.append(Spacer(1, 12))
-
-    # --- Detailed Table ---
-    table_data = [["TX_AMOUNT", "Fraud Probability", "Prediction Label", "TX_DATETIME"]]
-    for _, row in results_df.iterrows():
-        tx_dt_str = row["TX_DATETIME"].strftime("%Y-%m-%d %H:%M:%S") if pd.notnull(row["TX_DATETIME"]) else "-"
-        table_data.append([
-            row["TX_AMOUNT"],
-            f"{row['fraud_probability']:.2%}",
-            row["prediction_label"],
-            tx_dt_str
-        ])
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER")
-    ]))
-    elements.append(table)
-
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
-
-
-
 def generate_detailed_single_pdf(input_data, prob, pred_label, shap_values=None):
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     styles = getSampleStyleSheet()
@@ -183,34 +208,12 @@ def generate_detailed_single_pdf(input_data, prob, pred_label, shap_values=None)
     elements.append(Spacer(1, 12))
 
     # --- Gauge Chart for probability ---
-    gauge_buf = io.BytesIO()
-    fig, ax = plt.subplots(figsize=(3, 1.5))
-    ax.barh([0], [prob], color="red" if prob > 0.5 else "green")
-    ax.set_xlim(0, 1)
-    ax.set_yticks([])
-    ax.set_xlabel("Fraud Probability")
-    ax.set_title("Fraud Risk Gauge")
-    plt.tight_layout()
-    plt.savefig(gauge_buf, format="png")
-    plt.close(fig)
-    gauge_buf.seek(0)
-    elements.append(Image(gauge_buf, width=200, height=100))
+    elements.append(pdf_image(gauge_png(prob), width=200, height=100))
     elements.append(Spacer(1, 12))
 
     # --- SHAP/Feature Importance chart ---
     if shap_values:
-        shap_buf = io.BytesIO()
-        features = list(shap_values.keys())
-        values = list(shap_values.values())
-        fig2, ax2 = plt.subplots(figsize=(4, 3))
-        ax2.barh(features, values, color="blue")
-        ax2.set_title("Feature Impact (SHAP values)")
-        ax2.set_xlabel("Impact")
-        plt.tight_layout()
-        plt.savefig(shap_buf, format="png")
-        plt.close(fig2)
-        shap_buf.seek(0)
-        elements.append(Image(shap_buf, width=300, height=200))
+        elements.append(pdf_image(shap_bar_png(shap_values), width=300, height=200))
         elements.append(Spacer(1, 12))
 
     # --- Feature Table ---
@@ -233,7 +236,7 @@ def show():
     st.title("📂 Batch Fraud Prediction")
     st.markdown("Easily upload a CSV file to score multiple transactions at once.")
 
-    model, encoders, _ = cached_assets()
+    model, encoders, _, threshold = cached_assets()
     with st.expander("📄 Download Input Template"):
         st.write("Use this template format to prepare your CSV for batch prediction.")
         template_df = get_template_df()
@@ -250,59 +253,46 @@ def show():
 
     if uploaded_file:
         try:
-            with st.spinner("📊 Reading and preprocessing data..."):
-                input_df = read_csv_file(uploaded_file)
-                required_cols = [
-                    "TX_AMOUNT", "TX_TIME_SECONDS", "TX_TIME_DAYS",
-                    "TX_HOUR", "TX_WEEKDAY", "TX_MONTH", "IS_WEEKEND",
-                    "TX_AMOUNT_BIN", "TX_COUNT"
-                ]
-                missing_cols = [col for col in required_cols if col not in input_df.columns]
-
-                if missing_cols:
-                    st.error(f"⚠️ Your file is missing required columns: {', '.join(missing_cols)}, Please Download the Templete and Update it accordingly.")
+            cache = _pipeline_cache()
+            key = content_key(uploaded_file, model_version(), threshold)
+            scored = cache.get(key, "scores")
+            progress = None
+
+            if scored is None:
+                results_path = _new_results_path()
+                stats = BatchStats()
+                progress = StageProgress({"Scoring": 4, "Rendering": 1}, "Running batch predictions...")
+                on_scoring = progress.callback("Scoring")
+
+                try:
+                    results_df, features_df, had_missing = score_csv_in_chunks(
+                        uploaded_file, model, encoders, results_path, threshold,
+                        on_progress=lambda done, rows: on_scoring(done, f"{rows:,} rows scored"),
+                        stats=stats
+                    )
+                except MissingColumnsError as e:
+                    os.remove(results_path)
+                    st.error(f"⚠️ Your file is missing required columns: {', '.join(e.missing_cols)}, Please Download the Templete and Update it accordingly.")
                     st.stop()
+                except Exception:
+                    os.remove(results_path)
+                    st.error("⚠️ Model could not process this dataset. Please check column formats.")
+                    st.stop()
+                finally:
+                    progress.complete("Scoring")
+
+                scored = cache.put(key, "scores", {
+                    "results_df": results_df, "features_df": features_df,
+                    "had_missing": had_missing, "results_path": results_path, "stats": stats,
+                })
+                st.toast("✅ Predictions complete!", icon="🎉")
+
+            results_df, features_df = scored["results_df"], scored["features_df"]
+            results_path = scored["results_path"]
+
+            if scored["had_missing"]:
+                st.warning("⚠️ Missing values detected — they were filled with defaults.")
 
-                if input_df.isnull().values.any():
-                    st.warning("⚠️ Missing values detected — they will be filled with defaults.")
-                    input_df = input_df.fillna({
-                        "TX_AMOUNT": 0,
-                        "TX_TIME_SECONDS": 0,
-                        "TX_TIME_DAYS": 0,
-                        "TX_HOUR": 0,
-                        "TX_WEEKDAY": 0,
-                        "TX_MONTH": 1,
-                        "IS_WEEKEND": 0,
-                        "TX_AMOUNT_BIN": "Unknown",
-                        "TX_COUNT": 0
-                    })
-
-                processed_df = preprocess_input(input_df, encoders)
-
-            progress_text = "Running batch predictions..."
-            my_bar = st.progress(0, text=progress_text)
-            for pct in range(100):
-                time.sleep(0.01)
-                my_bar.progress(pct + 1, text=progress_text)
-            my_bar.empty()
-
-            try:
-                proba = model.predict_proba(processed_df)[:, 1]
-                preds = model.predict(processed_df)
-            except Exception:
-                st.error("⚠️ Model could not process this dataset. Please check column formats.")
-                st.stop()
-
-            results_df = pd.DataFrame({
-                "TX_AMOUNT": input_df.get("TX_AMOUNT", np.nan),
-                "TX_HOUR": input_df.get("TX_HOUR", np.nan),
-                "TX_WEEKDAY": input_df.get("TX_WEEKDAY", np.nan),
-                "fraud_probability": proba,
-                "prediction": preds,
-                "prediction_label": np.where(preds == 1, "Fraud", "Not Fraud")
-            })
-
-            st.toast("✅ Predictions complete!", icon="🎉")
             st.subheader("📋 Results Preview")
             st.dataframe(results_df.head(50), use_container_width=True)
 
@@ -310,33 +300,28 @@ def show():
 
             # --- Basic Mode ---
             if mode == "Basic Mode":
-                csv_output = io.StringIO()
                 timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-                results_df.to_csv(csv_output, index=False)
-                st.download_button("💾 Download Results (CSV)",
-                                   csv_output.getvalue(),
-                                   f"fraud_batch_result_{timestamp}.csv",
-                                   "text/csv")
+                with open(results_path, "rb") as f:
+                    st.download_button("💾 Download Results (CSV)",
+                                       f,
+                                       f"fraud_batch_result_{timestamp}.csv",
+                                       "text/csv")
 
             # --- Detailed Mode ---
             else:
+                agg = cache.get_or_compute(key, "aggregates", lambda: scored["stats"].summary())
+
                 st.subheader("📊 Fraud Insights")
 
                 # --- KPI Metrics ---
-                fraud_df = results_df[results_df["prediction_label"] == "Fraud"]
-                fraud_pct = len(fraud_df) / len(results_df) * 100 if len(results_df) else 0
-                avg_fraud_amt = fraud_df["TX_AMOUNT"].mean() if not fraud_df.empty else 0
-                common_hour = int(fraud_df["TX_HOUR"].mode()[0]) if not fraud_df.empty else "-"
-                common_day = int(fraud_df["TX_WEEKDAY"].mode()[0]) if not fraud_df.empty else "-"
-
                 col1, col2, col3, col4 = st.columns(4)
-                col1.metric("% Fraudulent", f"{fraud_pct:.1f}%")
-                col2.metric("Avg Fraud Amount", f"${avg_fraud_amt:,.2f}")
-                col3.metric("Most Common Hour", common_hour, help="Hour of day with most frauds")
-                col4.metric("Most Common Day", common_day, help="0=Mon, 6=Sun")
+                col1.metric("% Fraudulent", f"{agg['fraud_pct']:.1f}%")
+                col2.metric("Avg Fraud Amount", f"${agg['avg_fraud_amt']:,.2f}")
+                col3.metric("Most Common Hour", agg["common_hour"], help="Hour of day with most frauds")
+                col4.metric("Most Common Day", agg["common_day"], help="0=Mon, 6=Sun")
 
                 with st.expander("🚨 Top Suspicious Transactions"):
-                    top_frauds = results_df.sort_values("fraud_probability", ascending=False).head(5)
+                    top_frauds = agg["top_frauds"]
                     st.dataframe(top_frauds, use_container_width=True)
 
                     top_csv = io.StringIO()
@@ -346,114 +331,88 @@ def show():
                                        "top_suspicious_transactions.csv",
                                        "text/csv")
 
+                with st.expander("🧠 Explain Top Suspicious Transactions"):
+                    # Expander bodies always run; with the memory-mapped artifact the
+                    # explainer unpickles the full forest, so wait until it is asked for.
+                    explain = not isinstance(model, CompiledForest) or st.checkbox(
+                        "Load the SHAP explainer", help="Unpickles the full model for explanations.")
+                    explainer = get_explainer(model) if explain else None
+                    if explain and explainer is None:
+                        st.info("SHAP explanation not available for this model type.")
+                    elif explainer is not None:
+                        n_rows = len(results_df)
+                        top_n = n_rows if n_rows <= 5 else st.slider(
+                            "Rows to explain", 5, min(500, n_rows), min(20, n_rows)
+                        )
+                        top_idx = results_df["fraud_probability"].nlargest(top_n).index
+                        shap_df = explain_frame(explainer, features_df.loc[top_idx],
+                                                cache=get_shap_cache(), workers=SHAP_WORKERS)
+                        top_features = np.argsort(-shap_df.abs().to_numpy(), axis=1)[:, :3]
+                        explained = results_df.loc[top_idx, ["TX_AMOUNT", "fraud_probability", "prediction_label"]].copy()
+                        for k in range(top_features.shape[1]):
+                            explained[f"top_feature_{k + 1}"] = shap_df.columns.to_numpy()[top_features[:, k]]
+                        st.dataframe(explained, use_container_width=True)
+                        if st.checkbox("Show raw SHAP values"):
+                            st.dataframe(shap_df, use_container_width=True)
+
                 # *--- Charts ---
                 with st.expander("📉 Fraud vs Non-Fraud Count"):
-                    counts = results_df["prediction_label"].value_counts()
-                    fig, ax = plt.subplots(figsize=(4, 3))
-                    ax.bar(counts.index, counts.values, color=["red", "green"])
-                    ax.set_ylabel("Count")
-                    ax.set_title("Fraud vs Non-Fraud")
-                    st.pyplot(fig)
+                    st.image(fraud_counts_png(key, agg["counts"]))
 
                 with st.expander("📊 Fraud Probability Distribution"):
-                    fig2, ax2 = plt.subplots(figsize=(4, 3))
-                    ax2.hist(results_df["fraud_probability"], bins=20, color="blue", alpha=0.7)
-                    ax2.set_xlabel("Fraud Probability")
-                    ax2.set_ylabel("Frequency")
-                    st.pyplot(fig2)
+                    st.image(probability_hist_png(key, results_df["fraud_probability"]))
 
                 # --- Transaction Timeline ---
                 with st.expander("⏳ Transactions Over Time"):
-                    if "TX_DATETIME" not in results_df.columns and "TX_TIME_DAYS" in input_df.columns:
-                        base_date = pd.Timestamp("2020-01-01")
-                        results_df["TX_DATETIME"] = (
-                            base_date
-                            + pd.to_timedelta(input_df["TX_TIME_DAYS"], unit="D")
-                            + pd.to_timedelta(input_df["TX_TIME_SECONDS"], unit="s")
-                        )
                     if "TX_DATETIME" in results_df.columns:
-                        fig, ax = plt.subplots(figsize=(6, 3))
-                        ax.scatter(results_df["TX_DATETIME"], results_df["TX_AMOUNT"],
-                                c=(results_df["prediction_label"] == "Fraud"),
-                                cmap="coolwarm", alpha=0.6)
-                        ax.set_title("Transactions Timeline (Fraud vs Non-Fraud)")
-                        ax.set_ylabel("TX_AMOUNT")
-                        ax.set_xlabel("TX_DATETIME")
-                        st.pyplot(fig)
+                        if len(results_df) > DENSITY_MIN_ROWS:
+                            st.caption(f"{len(results_df):,} rows: showing binned transaction density instead of individual points.")
+                        st.image(timeline_png(key, results_df["TX_DATETIME"], results_df["TX_AMOUNT"],
+                                              (results_df["prediction_label"] == "Fraud").to_numpy()))
 
                 # --- Fraud Amount Distribution ---
                 with st.expander("💵 Fraud Amount Distribution"):
-                    fig, ax = plt.subplots(figsize=(5, 3))
-                    fraud_df = results_df[results_df["prediction_label"] == "Fraud"]
-                    nonfraud_df = results_df[results_df["prediction_label"] == "Not Fraud"]
-                    ax.hist([fraud_df["TX_AMOUNT"], nonfraud_df["TX_AMOUNT"]],
-                            bins=30, stacked=True, label=["Fraud", "Not Fraud"], alpha=0.7)
-                    ax.legend()
-                    ax.set_title("Fraud vs Non-Fraud Amount Distribution")
-                    st.pyplot(fig)
+                    st.image(amount_hist_png(key, results_df["TX_AMOUNT"].to_numpy(),
+                                             (results_df["prediction_label"] == "Fraud").to_numpy()))
 
                 # --- Top Customers by Fraud Count ---
-                if "CUSTOMER_ID" in input_df.columns:
+                if agg["top_customers"] is not None:
                     with st.expander("👥 Top Fraudulent Customers"):
-                        top_customers = (
-                            results_df[results_df["prediction_label"] == "Fraud"]
-                            .groupby("CUSTOMER_ID")
-                            .size().nlargest(10)
-                        )
-                        st.bar_chart(top_customers)
+                        st.bar_chart(agg["top_customers"])
 
                 # --- TX_AMOUNT Range Analysis ---
                 with st.expander("📊 Fraud Count by Amount Ranges"):
-                    max_amount = results_df["TX_AMOUNT"].max()
-                    bins = [0, 100, 500, 1000, 5000, 10000]
-                    bins.append(max_amount + 1)
-                    bins = sorted(set(bins))
-
-                    labels = ["<100", "100-500", "500-1000", "1000-5000", "5000-10000", "10k+"]
-
-                    if len(labels) > len(bins) - 1:
-                        labels = labels[:len(bins) - 1]
-                    elif len(labels) < len(bins) - 1:
-                        labels += [f"{bins[i]}-{bins[i+1]}" for i in range(len(labels), len(bins) - 1)]
-
-                    results_df["AmountRange"] = pd.cut(
-                        results_df["TX_AMOUNT"],
-                        bins=bins,
-                        labels=labels,
-                        include_lowest=True
-                    )
-
-                    fraud_by_range = (
-                        results_df.groupby(["AmountRange", "prediction_label"])
-                        .size()
-                        .unstack(fill_value=0)
-                    )
-                    st.bar_chart(fraud_by_range)
+                    st.bar_chart(agg["fraud_by_range"])
 
                 # --- Correlation Heatmap ---
                 with st.expander("🔗 Feature Correlation Heatmap"):
-                    numeric_cols = results_df.select_dtypes(include=["int64", "float64"]).columns
-                    if len(numeric_cols) > 1:
-                        fig, ax = plt.subplots(figsize=(6, 4))
-                        corr = results_df[numeric_cols].corr()
-                        cax = ax.matshow(corr, cmap="coolwarm")
-                        plt.xticks(range(len(numeric_cols)), numeric_cols, rotation=90)
-                        plt.yticks(range(len(numeric_cols)), numeric_cols)
-                        fig.colorbar(cax)
-                        st.pyplot(fig)
-                
+                    if agg["corr"] is not None:
+                        st.image(correlation_png(key, agg["corr"]))
+
                 # --- Downloads ---
                 st.subheader("⬇️ Export Results")
-                csv_output = io.StringIO()
                 timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-                results_df.to_csv(csv_output, index=False)
-                st.download_button("💾 Download CSV", csv_output.getvalue(),
-                                   f"fraud_batch_result_{timestamp}.csv", "text/csv")
-
-                pdf_output = generate_pdf_with_charts(results_df)
-                st.download_button("📄 Download PDF", pdf_output,
-                                   f"fraud_batch_predictions_{timestamp}.pdf", "application/pdf")
+                with open(results_path, "rb") as f:
+                    st.download_button("💾 Download CSV", f,
+                                       f"fraud_batch_result_{timestamp}.csv", "text/csv")
+
+                # The PDF is built on request, straight to disk, and reused until the next upload.
+                pdf_ready = st.session_state.get("batch_report_source") == results_path
+                if not pdf_ready and st.button("📄 Build PDF Report"):
+                    with st.spinner("Building PDF report..."):
+                        write_batch_report(results_df, _session_file("batch_report_path", ".pdf"),
+                                           key=key, stats=scored["stats"])
+                    st.session_state["batch_report_source"] = results_path
+                    pdf_ready = True
+                if pdf_ready:
+                    with open(st.session_state["batch_report_path"], "rb") as f:
+                        st.download_button("📄 Download PDF", f,
+                                           f"fraud_batch_predictions_{timestamp}.pdf", "application/pdf")
+
+            if progress is not None:
+                progress.complete("Rendering")
+                progress.close()
 
         except Exception as e:
             st.error("⚠️ Something went wrong while processing your file. Please check formatting.")
-            st.exception(e)
\ No newline at end of file
+            st.exception(e)
@@ -1,57 +1,85 @@
 import os, datetime
 import streamlit as st
 import pandas as pd
-from src.feature_engineering import load_processed_data
+from src.feature_engineering import (
+    FEATURE_STORE_DIR, MANIFEST_FILE, OUTPUT_FILE, SUMMARY_FILE,
+    build_summary, load_processed_data, load_summary, save_summary
+)
 from utils.ui import (
     page_header, page_transition, card_start, card_end,
-    dataframe, fraud_ratio_metrics, loading_bar, spinner
+    dataframe, two_metrics, spinner
 )
 
+TOP_K = 10
+
 # --- Safe Loader ---
 @st.cache_data(show_spinner=False)
-def _load_feature_df(path: str) -> pd.DataFrame:
-    df = load_processed_data(path)
+def _load_summary(path: str, mtime: float = 0.0) -> dict:
+    return load_summary(path)
+
+
+def _ensure_summary() -> str:
+    """Build the summary once from the processed data if it has not been generated yet."""
+    if os.path.exists(SUMMARY_FILE):
+        return SUMMARY_FILE
+
+    feature_path = OUTPUT_FILE
+    if os.path.exists(MANIFEST_FILE) and os.path.isdir(FEATURE_STORE_DIR):
+        feature_path = FEATURE_STORE_DIR
+    df = load_processed_data(feature_path)
     df.columns = [str(c).strip() for c in df.columns]
-    return df
+    save_summary(build_summary(df), SUMMARY_FILE)
+    return SUMMARY_FILE
+
+
+def _chart(counts: dict, key: str, missing_col: str, top_k: int | None = None):
+    table = counts.get(key)
+    if table is None:
+        st.info(f"`{missing_col}` column not found.")
+        return
+    if top_k is not None:
+        table = table.loc[table.sum(axis=1).nlargest(top_k).index]
+        table.index = table.index.astype(str)
+    st.bar_chart(table, height=300, use_container_width=True)
 
 
 def show():
     page_transition()
     page_header("🔧 Feature Engineered Data", "Explore engineered features and class balance.")
 
-    feature_path = "processed/feature_engineered_df.pkl"
-
     # -- Load with spinner ---
     try:
-        with spinner("Loading feature-engineered dataset..."):
-            df = _load_feature_df(feature_path)
-        if df is None or df.empty:
+        with spinner("Loading feature summary..."):
+            summary_path = _ensure_summary()
+            summary = _load_summary(summary_path, os.path.getmtime(summary_path))
+        if not summary["rows"]:
             st.warning("⚠️ Loaded dataset is empty.")
             return
-        loading_bar("Finalizing view…", steps=3, delay=0.08)
     except FileNotFoundError:
-        st.error(f"❌ Could not find **{feature_path}**. Please generate it first.")
+        st.error(f"❌ Could not find **{OUTPUT_FILE}**. Please generate it first.")
         return
     except Exception as e:
         st.exception(e)
         return
 
+    counts = summary["counts"]
+
     # --- Dataset Overview ---
     card_start()
     st.markdown("### 📋 Dataset Overview")
 
-    file_info = os.stat(feature_path)
+    file_info = os.stat(summary_path)
     c1, c2, c3, c4 = st.columns(4)
-    with c1: st.metric("Rows", f"{df.shape[0]:,}")
-    with c2: st.metric("Columns", f"{df.shape[1]}")
-    with c3: st.metric("Memory", f"{df.memory_usage(deep=True).sum() / 1_048_576:.2f} MB")
+    with c1: st.metric("Rows", f"{summary['rows']:,}")
+    with c2: st.metric("Columns", f"{len(summary['dtypes'])}")
+    with c3: st.metric("Memory", f"{summary['memory_bytes'] / 1_048_576:.2f} MB")
     with c4: st.metric("Last Updated", datetime.datetime.fromtimestamp(file_info.st_mtime).strftime("%b %d, %Y"))
 
     with st.expander("⚙️ Columns & Data Types", expanded=False):
         dtype_df = pd.DataFrame({
-            "Column": df.columns,
-            "Dtype": df.dtypes.astype(str),
-            "Non-Null Count": df.notnull().sum().values
+            "Column": list(summary["dtypes"].keys()),
+            "Dtype": list(summary["dtypes"].values()),
+            "Non-Null Count": summary["non_null"].reindex(list(summary["dtypes"].keys())).fillna(0).astype(int).values
         })
         st.dataframe(dtype_df, use_container_width=True, height=320)
 
@@ -60,71 +88,46 @@ def show():
     # --- Fraud Ratio ---
     card_start()
     st.markdown("### ⚖️ Class Balance")
-    if "TX_FRAUD" in df.columns:
-        fraud_ratio_metrics(df, target_col="TX_FRAUD")
-    
-    # Exploratory Graphs 
+    if summary["has_label"]:
+        label_counts = counts["label"]
+        total = label_counts.sum() or 1
+        two_metrics("Non-Fraud", f"{label_counts.get(0, 0) / total * 100:.2f}%",
+                    "Fraud", f"{label_counts.get(1, 0) / total * 100:.2f}%")
+
+    # Exploratory Graphs
     st.markdown("### 📊 Exploratory Graphs")
     graph1, graph2 = st.columns([1,1])
 
     with graph1:
         with st.expander("📈 Number of Transactions Over Time", expanded=False):
-            if "TX_DATETIME" in df.columns:
-                try:
-                    df["TX_DATETIME"] = pd.to_datetime(df["TX_DATETIME"], errors="coerce")
-                    tx_per_day = df.groupby(df["TX_DATETIME"].dt.date).size()
-                    st.line_chart(tx_per_day, height=300, use_container_width=True)
-                except Exception as e:
-                    st.warning("Could not plot TX_DATETIME series.")
-                    st.exception(e)
+            daily = counts.get("daily")
+            if daily is not None:
+                st.line_chart(daily, height=300, use_container_width=True)
             else:
                 st.info("`TX_DATETIME` column not found.")
 
         with st.expander("💵 Transaction Amount Distribution", expanded=False):
-            if "TX_AMOUNT" in df.columns:
-                bins = [0, 10, 50, 100, 500, 1000, 5000, 10000, float("inf")]
-                labels = ["0-10", "10-50", "50-100", "100-500", "500-1k", "1k-5k", "5k-10k", "10k+"]
-                df["AMOUNT_BIN"] = pd.cut(df["TX_AMOUNT"], bins=bins, labels=labels, include_lowest=True)
-                amount_counts = df["AMOUNT_BIN"].value_counts().sort_index()
-                st.bar_chart(amount_counts, height=300, use_container_width=True)
-            else:
-                st.info("`TX_AMOUNT` column not found.")
+            _chart(counts, "amount_bin", "TX_AMOUNT")
 
-        with st.expander("👥 Top 10 Customers by Number of Transactions", expanded=False):
-            if "CUSTOMER_ID" in df.columns:
-                top_customers = df["CUSTOMER_ID"].value_counts().head(10)
-                st.bar_chart(top_customers, height=300, use_container_width=True)
-            else:
-                st.info("`CUSTOMER_ID` column not found.")
+        with st.expander(f"👥 Top {TOP_K} Customers by Number of Transactions", expanded=False):
+            _chart(counts, "customer", "CUSTOMER_ID", top_k=TOP_K)
 
-    with graph2: 
-        with st.expander("🏦 Top 10 Merchants by Number of Transactions", expanded=False):
-            if "TERMINAL_ID" in df.columns:
-                top_merchants = df["TERMINAL_ID"].value_counts().head(10)
-                st.bar_chart(top_merchants, height=300, use_container_width=True)
-            else:
-                st.info("`TERMINAL_ID` column not found.")
+    with graph2:
+        with st.expander(f"🏦 Top {TOP_K} Merchants by Number of Transactions", expanded=False):
+            _chart(counts, "terminal", "TERMINAL_ID", top_k=TOP_K)
 
         with st.expander("⏰ Transactions by Hour of Day", expanded=False):
-            if "TX_HOUR" in df.columns:
-                tx_per_hour = df["TX_HOUR"].value_counts().sort_index()
-                st.bar_chart(tx_per_hour, height=300, use_container_width=True)
-            else:
-                st.info("`TX_HOUR` column not found.")
+            _chart(counts, "hourly", "TX_HOUR")
 
         with st.expander("📆 Transactions by Weekday", expanded=False):
-            if "TX_WEEKDAY" in df.columns:
-                tx_per_wd = df["TX_WEEKDAY"].value_counts().sort_index()
-                st.bar_chart(tx_per_wd, height=300, use_container_width=True)
-            else:
-                st.info("`TX_WEEKDAY` column not found.")
+            _chart(counts, "weekday", "TX_WEEKDAY")
 
     card_end()
 
     # --- Data Preview ----
     card_start()
     st.markdown("### 👀 Data Preview")
-    
+
     with st.popover("💡 Tips"):
         st.markdown(
             "- Adjust the **row slider** to control preview size.\n"
@@ -132,10 +135,11 @@ def show():
             "- Download the preview for external analysis."
         )
 
+    preview = summary["preview"]
     row_count = st.slider("Rows to preview", min_value=5, max_value=100, value=50, step=5)
-    
-    selected_cols = st.multiselect("Columns to display", df.columns.tolist(), default=df.columns.tolist()[:10])
-    preview_df = df[selected_cols].head(row_count)
+
+    selected_cols = st.multiselect("Columns to display", preview.columns.tolist(), default=preview.columns.tolist()[:10])
+    preview_df = preview[selected_cols].head(row_count)
 
     dataframe(preview_df, caption=f"Showing first {row_count} rows and {len(selected_cols)} columns")
 
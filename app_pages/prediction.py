@@ -1,14 +1,19 @@
+import os
+import datetime
 import streamlit as st
 import joblib
 import pandas as pd
 import numpy as np
-import shap
 import altair as alt
 
+from src.explanations import ShapCache, explain_frame
+from src.scoring import FEATURE_ORDER, MODEL_PATH, preprocess_input, read_assets, score
+from src.online_features import STORE_PATH, OnlineFeatureStore, build_store
+from src.tree_engine import CompiledForest
 from src.probability_gauge import show_probability_gauge
 from utils.ui import (
     inject_css, page_header, page_transition, spinner,
-    loading_bar, card_end, card_start
+    stage_progress, card_end, card_start
 )
 
 # ---------------------------
@@ -17,63 +22,37 @@ from utils.ui import (
 @st.cache_resource
 def load_assets():
     try:
-        saved = joblib.load("models/fraud_detection_model.pkl")
-        return (
-            saved["model"],
-            saved["encoders"],
-            saved.get("categorical_cols", []),
-        )
+        return read_assets()
     except Exception as e:
         st.error("❌ Could not load model assets.")
         st.exception(e)
         st.stop()
+        # st.stop() only interrupts the script thread; from the warm-up thread
+        # re-raise so a failed load is never cached.
+        raise
 
 @st.cache_resource
 def get_explainer(_model):
     try:
+        import shap  # deferred: importing shap is slow and only needed for explanations
+
+        if isinstance(_model, CompiledForest):
+            # SHAP needs the scikit-learn trees; only explanations pay for unpickling them.
+            _model = joblib.load(MODEL_PATH)["model"]
         return shap.Explainer(_model)
     except Exception:
         return None
 
+@st.cache_resource
+def get_shap_cache():
+    return ShapCache()
+
 # ---------------------------
 # Helpers
 # ---------------------------
-def preprocess_input(data: pd.DataFrame, encoders: dict) -> pd.DataFrame:
-    data = data.copy()
-    for col, le in encoders.items():
-        if col in data.columns:
-            mapping = dict(zip(le.classes_, le.transform(le.classes_)))
-            data[col] = data[col].map(mapping).fillna(-1).astype(int)
-    feature_order = [
-        "TX_AMOUNT",
-        "TX_TIME_SECONDS",
-        "TX_TIME_DAYS",
-        "TX_HOUR",
-        "TX_WEEKDAY",
-        "TX_MONTH",
-        "IS_WEEKEND",
-        "TX_AMOUNT_BIN",
-        "TX_COUNT",
-    ]
-    for c in list(data.columns):
-        if c not in feature_order:
-            data.drop(columns=[c], inplace=True)
-    for c in feature_order:
-        if c not in data.columns:
-            data[c] = 0
-
-    return data[feature_order]
-
 def compute_shap_for_row(explainer, processed_row: pd.DataFrame) -> pd.Series:
-    shap_values = explainer(processed_row)
-    row_vals = shap_values.values[0]
-
-    if row_vals.ndim == 2 and row_vals.shape[1] > 1:
-        row_vals = row_vals[:, 1]
-    elif row_vals.ndim == 2:
-        row_vals = row_vals[:, 0]
-
-    return pd.Series(row_vals, index=processed_row.columns)
+    shap_df = explain_frame(explainer, processed_row.head(1), cache=get_shap_cache())
+    return shap_df.iloc[0]
 
 def shap_bar_chart(shap_series: pd.Series, orig_row: pd.Series, top_n: int = 10):
     df = pd.DataFrame({
@@ -102,20 +81,14 @@ def shap_bar_chart(shap_series: pd.Series, orig_row: pd.Series, top_n: int = 10)
         .properties(height=max(220, 20*len(df)), width="container")
     )
 
-def init_store():
-    if "saved_predictions" not in st.session_state:
-        st.session_state["saved_predictions"] = [] 
-
-def show():
-    inject_css()
-    page_transition()
-    page_header("🔮 Fraud Prediction", "Single-transaction prediction with feature contributions.")
-
-    model, encoders, categorical_cols = load_assets()
-    explainer = get_explainer(model)
-    init_store()
+@st.cache_resource(show_spinner=False)
+def get_online_store() -> OnlineFeatureStore:
+    """Customer/terminal history shared by all sessions; built from the raw data on first use."""
+    if os.path.exists(STORE_PATH):
+        return OnlineFeatureStore.restore(STORE_PATH)
+    return build_store(path=STORE_PATH)
 
-    # --- Input Form ---
+def _manual_form():
     with st.form("single_tx_form"):
         st.subheader("Enter Transaction Details")
 
@@ -131,7 +104,7 @@ def show():
         with col3: 
             TX_WEEKDAY = st.slider( "Weekday (0=Mon, 6=Sun)", 0, 6, 3, 
                                    help="The day of the week (0=Monday, 6=Sunday). Fraud patterns may differ between weekdays and weekends." ) 
-        
+    
         col4, col5 = st.columns(2) 
         with col4: 
             IS_WEEKEND = st.selectbox( "Is Weekend(0=No, 1=Yes)", [0, 1], index=0, 
@@ -139,7 +112,7 @@ def show():
         with col5: 
             TX_AMOUNT_BIN = st.selectbox( "Amount Bin (Range of Transaction)", ["0-10", "10-50", "50-100", "100-500", "500-1000", "1000-5000", "5000+"], index=3, 
                                          help="Predefined range of the transaction amount. Helps model understand amount categories." ) 
-        
+    
         col6, col7, col8 = st.columns(3) 
         with col6: 
             TX_COUNT = st.number_input( "Customer's Tax Count", min_value=0, value=10, step=1, 
@@ -153,12 +126,7 @@ def show():
 
         submitted = st.form_submit_button("🔍 Predict")
 
-    if not submitted:
-        st.info("Fill the fields and click **Predict** to see results.")
-        return
-
-    # --- Build Input ---
-    raw_row = pd.Series({
+    raw_row = {
         "TX_AMOUNT": TX_AMOUNT,
         "TX_TIME_SECONDS": TX_TIME_SECONDS,
         "TX_TIME_DAYS": TX_TIME_DAYS,
@@ -168,56 +136,131 @@ def show():
         "IS_WEEKEND": IS_WEEKEND,
         "TX_AMOUNT_BIN": TX_AMOUNT_BIN,
         "TX_COUNT": TX_COUNT,
-    })
-    input_df = pd.DataFrame([raw_row])
-    processed_df = preprocess_input(input_df, encoders)
+    }
+    return submitted, raw_row, None
+
+def _history_form(store: OnlineFeatureStore):
+    with st.form("history_tx_form"):
+        st.subheader("Enter Raw Transaction")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            customer_id = st.number_input("Customer ID", min_value=0, value=0, step=1)
+        with col2:
+            terminal_id = st.number_input("Terminal ID", min_value=0, value=0, step=1)
+        with col3:
+            amount = st.number_input("Transaction Amount", min_value=0.0, value=100.0, step=1.0)
 
-    # --- Predict --
-    with spinner("Scoring transaction..."):
-        loading_bar("Processing", steps=5, delay=0.1)
+        col4, col5 = st.columns(2)
+        with col4:
+            tx_date = st.date_input("Date", value=datetime.date(2018, 9, 30))
+        with col5:
+            tx_time = st.time_input("Time", value=datetime.time(12, 0))
+        record = st.checkbox("Record this transaction in the customer history", value=False,
+                             help="Later predictions for this customer and terminal will count it.")
+
+        submitted = st.form_submit_button("🔍 Predict")
+
+    timestamp = datetime.datetime.combine(tx_date, tx_time)
+    features = store.features(customer_id, terminal_id, timestamp, amount)
+    tx = {"customer_id": customer_id, "terminal_id": terminal_id, "timestamp": timestamp,
+          "amount": amount, "record": record}
+    return submitted, features, tx
+
+def init_store():
+    if "saved_predictions" not in st.session_state:
+        st.session_state["saved_predictions"] = [] 
+
+def show():
+    inject_css()
+    page_transition()
+    page_header("🔮 Fraud Prediction", "Single-transaction prediction with feature contributions.")
+
+    model, encoders, categorical_cols, threshold = load_assets()
+    init_store()
+
+    # --- Input Form ---
+    mode = st.radio("Input", ["Enter features", "Derive from customer history"], horizontal=True,
+                    help="Derive TX_COUNT, time offsets and amount bin from the online feature store.")
+    if mode == "Enter features":
+        submitted, features, tx = _manual_form()
+    else:
         try:
-            proba = float(model.predict_proba(processed_df)[:, 1][0])
-            pred = int(model.predict(processed_df)[0])
+            with spinner("Loading customer history..."):
+                store = get_online_store()
         except Exception as e:
-            st.error("❌ Prediction failed.")
+            st.error("❌ Could not load the online feature store.")
             st.exception(e)
             return
+        submitted, features, tx = _history_form(store)
 
-    # --- Results ---
-    show_probability_gauge(proba)
+    if not submitted:
+        st.info("Fill the fields and click **Predict** to see results.")
+        return
 
-    st.metric(
-        "Fraud Result",
-        value="🛑 Fraud" if pred == 1 else "✅ Not Fraud",
+    # --- Build Input ---
+    raw_row = pd.Series({f: features[f] for f in FEATURE_ORDER})
+    if tx is not None:
+        with st.expander("🗂️ Derived features"):
+            st.dataframe(pd.DataFrame([features]).T.rename(columns={0: "value"}), use_container_width=True)
+        if tx.pop("record"):
+            store.update(**tx)
+            # Persist right away so recorded history survives a restart.
+            store.snapshot(STORE_PATH)
 
-        delta_color="normal" if pred == 1 else "inverse",
-    )
+    input_df = pd.DataFrame([raw_row])
+    with stage_progress({"Preprocessing": 1, "Scoring": 2, "Explaining": 2}, "Processing") as progress:
+        processed_df = preprocess_input(input_df, encoders)
+        progress.complete("Preprocessing")
 
-    # --- Model Input ---
-    card_start()
-    st.markdown("### Model Input (Encoded)")
-    st.dataframe(processed_df, use_container_width=True)
-    card_end()
+        # --- Predict --
+        with spinner("Scoring transaction..."):
+            try:
+                probas, preds = score(model, processed_df, threshold)
+                proba, pred = float(probas[0]), int(preds[0])
+            except Exception as e:
+                st.error("❌ Prediction failed.")
+                st.exception(e)
+                return
+        progress.complete("Scoring")
 
-    # --- SHAP Explanation ---
-    card_start()
-    st.subheader("Top Feature Contributions (SHAP)")
-    try:
-        if explainer:
-            shap_series = compute_shap_for_row(explainer, processed_df)
-            st.altair_chart(shap_bar_chart(shap_series, raw_row, top_n=10), use_container_width=True)
-
-            with st.expander("📊 View raw SHAP values"):
-                shap_df = pd.DataFrame({
-                    "feature": shap_series.index,
-                    "value": [raw_row.get(f, None) for f in shap_series.index],
-                    "shap": shap_series.values,
-                    "abs_shap": np.abs(shap_series.values),
-                }).sort_values("abs_shap", ascending=False)
-                st.dataframe(shap_df, use_container_width=True)
-        else:
-            st.info("SHAP explanation not available for this model type.")
-    except Exception as e:
-        st.warning("⚠️ SHAP explanation failed.")
-        st.exception(e)
-    card_end()
+        # --- Results ---
+        show_probability_gauge(proba)
+
+        st.metric(
+            "Fraud Result",
+            value="🛑 Fraud" if pred == 1 else "✅ Not Fraud",
+
+            delta_color="normal" if pred == 1 else "inverse",
+        )
+
+        # --- Model Input ---
+        card_start()
+        st.markdown("### Model Input (Encoded)")
+        st.dataframe(processed_df, use_container_width=True)
+        card_end()
+
+        # --- SHAP Explanation ---
+        card_start()
+        st.subheader("Top Feature Contributions (SHAP)")
+        try:
+            # Built only here: with the memory-mapped artifact this unpickles the forest.
+            explainer = get_explainer(model)
+            if explainer:
+                shap_series = compute_shap_for_row(explainer, processed_df)
+                st.altair_chart(shap_bar_chart(shap_series, raw_row, top_n=10), use_container_width=True)
+
+                with st.expander("📊 View raw SHAP values"):
+                    shap_df = pd.DataFrame({
+                        "feature": shap_series.index,
+                        "value": [raw_row.get(f, None) for f in shap_series.index],
+                        "shap": shap_series.values,
+                        "abs_shap": np.abs(shap_series.values),
+                    }).sort_values("abs_shap", ascending=False)
+                    st.dataframe(shap_df, use_container_width=True)
+            else:
+                st.info("SHAP explanation not available for this model type.")
+        except Exception as e:
+            st.warning("⚠️ SHAP explanation failed.")
+            st.exception(e)
+        progress.complete("Explaining")
+        card_end()
@@ -1,8 +1,13 @@
 import os, datetime
 import streamlit as st
 import pandas as pd
-from src.data_loader import list_raw_files, load_raw_data
-from utils.ui import page_header, page_transition, card_start, card_end, dataframe, spinner, loading_bar
+from src.data_loader import list_raw_files, load_raw_data_with_profile
+from src.search import RawDataSearchIndex
+from utils.ui import page_header, page_transition, card_start, card_end, dataframe, spinner
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _search_index(file_path: str, mtime: float, _df: pd.DataFrame) -> RawDataSearchIndex:
+    return RawDataSearchIndex(_df)
 
 def show():
     page_transition()
@@ -23,8 +28,7 @@ def show():
     file_stats = os.stat(file_path)
 
     with spinner(f"Loading `{selected_file}`..."):
-        df = load_raw_data(file_path)
-    loading_bar("Preparing data", steps=3, delay=0.1)
+        df, profile = load_raw_data_with_profile(file_path)
 
     # --- File info metrics ---
     col1, col2, col3, col4 = st.columns(4)
@@ -48,24 +52,31 @@ def show():
     preview_df = df.iloc[start_idx:end_idx]
 
     # --- Search filter ---
-    search_term = st.text_input("🔍 Search (case-insensitive, across all text columns)", "")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search_term = st.text_input("🔍 Search (case-insensitive, across all columns)", "")
+    with col2:
+        search_in = st.selectbox("Search in", ["All columns", "TRANSACTION_ID", "CUSTOMER_ID", "TERMINAL_ID"],
+                                 help="ID columns use an exact-match index lookup.")
     if search_term.strip():
-        mask = df.apply(
-            lambda row: row.astype(str).str.contains(search_term, case=False, na=False).any(), axis=1
-        )
-        preview_df = df[mask].iloc[start_idx:end_idx]
+        index = _search_index(file_path, file_stats.st_mtime, df)
+        column = None if search_in == "All columns" or search_in not in index.id_indexes else search_in
+        preview_df, has_more = index.search(search_term.strip(), offset=start_idx,
+                                            limit=end_idx - start_idx, column=column)
+        if has_more:
+            st.caption("More matches exist — move the start row forward to see the next page.")
 
     dataframe(preview_df, caption=f"Rows {start_idx:,} to {end_idx:,}")
 
     # --- Expanders for more info ---
     with st.expander("📑 Column Information", expanded=False):
         st.write(pd.DataFrame({
-            "Column": df.columns,
-            "Datatype": [str(dtype) for dtype in df.dtypes],
-            "Non-Null Count": df.notnull().sum().values
+            "Column": list(profile["dtypes"].keys()),
+            "Datatype": list(profile["dtypes"].values()),
+            "Non-Null Count": profile["non_null_counts"].values
         }))
 
     with st.expander("📊 Quick Statistics", expanded=False):
-        st.write(df.describe(include="all").transpose())
+        st.write(profile["describe"])
 
     card_end()
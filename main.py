@@ -4,6 +4,7 @@ import random, time, importlib
 from app_pages import home
 from streamlit_option_menu import option_menu
 from utils.ui import inject_css, page_transition
+from src.warmup import start_warmup, warmup_status
 
 # --- Page Config & Caching ---
 st.set_page_config(
@@ -19,6 +20,11 @@ def load_global_ui():
 
 load_global_ui()
 
+# --- Background warm-up ---
+# Model, encoders and SHAP explainer start loading as soon as the server runs
+# its first script, so the first prediction does not pay for them.
+start_warmup()
+
 # --- Page Registry ---
 PAGES = {
     "🏠 Home": "app_pages.home",
@@ -40,6 +46,14 @@ with st.sidebar:
     )
     st.markdown("---")
 
+    status = warmup_status()
+    if status["ready"]:
+        st.caption("✅ Model ready")
+    elif any(state == "failed" for state in status["stages"].values()):
+        st.caption("⚠️ Model warm-up failed")
+    else:
+        st.caption("⏳ Model warming up...")
+
 # --- Page Loader ---
 def load_page(page_module: str):
     """Dynamically import and display a page."""
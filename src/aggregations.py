@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+WINDOWS_DAYS = (1, 7, 30)
+# Fraud labels are only known some days after a transaction, so terminal
+# risk is measured over a window that ends this many days in the past.
+TERMINAL_DELAY_DAYS = 7
+# Days of history a row needs for every windowed feature to be complete.
+LOOKBACK_DAYS = max(WINDOWS_DAYS) + TERMINAL_DELAY_DAYS
+SECONDS_PER_DAY = 86_400
+# TX_AMOUNT_BIN edges; the model's encoder was fitted on these labels.
+AMOUNT_BINS = [-1, 10, 50, 100, 500, 1000, 5000, np.inf]
+AMOUNT_LABELS = ["0-10", "10-50", "50-100", "100-500", "500-1000", "1000-5000", "5000+"]
+
+
+def customer_window_columns(windows=WINDOWS_DAYS) -> dict:
+    cols = {}
+    for w in windows:
+        cols[f"CUSTOMER_ID_NB_TX_{w}DAY_WINDOW"] = "int32"
+        cols[f"CUSTOMER_ID_AVG_AMOUNT_{w}DAY_WINDOW"] = "float32"
+    return cols
+
+def terminal_window_columns(windows=WINDOWS_DAYS) -> dict:
+    cols = {}
+    for w in windows:
+        cols[f"TERMINAL_ID_NB_TX_{w}DAY_WINDOW"] = "int32"
+        cols[f"TERMINAL_ID_RISK_{w}DAY_WINDOW"] = "float32"
+    return cols
+
+
+class SortedWindows:
+    """Per-key trailing time windows over one frame, without a Python loop.
+
+    Rows are sorted once by (key, time) and each row is given a composite
+    int64 `key_code * span + time`, where `span` exceeds the time range plus
+    the widest window. A window (t - w, t] then never crosses into another
+    key, so its start is one `np.searchsorted` over the whole array, and
+    sums come from a cumulative sum. Results are scattered back to the
+    original row order.
+    """
+
+    def __init__(self, keys, times, max_window: int):
+        codes = pd.factorize(np.asarray(keys))[0].astype(np.int64) + 1
+        times = np.asarray(times, dtype=np.int64)
+        self.order = np.lexsort((times, codes))
+        self.n = len(times)
+        if self.n == 0:
+            self.composite = np.empty(0, dtype=np.int64)
+            return
+
+        t0 = times.min()
+        span = int(times.max() - t0) + max_window + 1
+        if int(codes.max()) > np.iinfo(np.int64).max // span - 1:
+            raise OverflowError("Too many keys for the time range to build composite window keys.")
+        self.max_window = max_window
+        self.composite = codes[self.order] * span + (times[self.order] - t0)
+
+    def _unsort(self, sorted_values: np.ndarray) -> np.ndarray:
+        out = np.empty_like(sorted_values)
+        out[self.order] = sorted_values
+        return out
+
+    def aggregate(self, values, window: int):
+        """Return (count, sum of `values`) over each row's window (t - window, t].
+
+        Rows of a key sharing a timestamp count up to and including the
+        current row, in row order, like a pandas time-based rolling window.
+        """
+        if self.n == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        if window > self.max_window:
+            raise ValueError(f"Window {window} is wider than max_window {self.max_window}.")
+
+        pos = np.arange(self.n)
+        start = np.searchsorted(self.composite, self.composite - window, side="right")
+        csum = np.concatenate(([0.0], np.cumsum(np.asarray(values, dtype=np.float64)[self.order])))
+        return self._unsort(pos - start + 1), self._unsort(csum[pos + 1] - csum[start])
+
+
+def _epoch_seconds(datetimes: pd.Series) -> np.ndarray:
+    return pd.to_datetime(datetimes).to_numpy().astype("datetime64[s]").astype(np.int64)
+
+def add_entity_count(df: pd.DataFrame, key: str = "CUSTOMER_ID", name: str = "TX_COUNT") -> pd.DataFrame:
+    """Number of rows per `key`, broadcast back onto every row in place."""
+    df[name] = df.groupby(key, sort=False)[key].transform("size")
+    return df
+
+def add_customer_window_features(df: pd.DataFrame, windows=WINDOWS_DAYS) -> pd.DataFrame:
+    """Transaction count and mean amount per customer over the last 1/7/30 days."""
+    windows_s = [w * SECONDS_PER_DAY for w in windows]
+    engine = SortedWindows(df["CUSTOMER_ID"], _epoch_seconds(df["TX_DATETIME"]), max(windows_s))
+    amounts = df["TX_AMOUNT"].to_numpy()
+    for w, w_s in zip(windows, windows_s):
+        count, total = engine.aggregate(amounts, w_s)
+        df[f"CUSTOMER_ID_NB_TX_{w}DAY_WINDOW"] = count
+        df[f"CUSTOMER_ID_AVG_AMOUNT_{w}DAY_WINDOW"] = total / np.maximum(count, 1)
+    return df
+
+def add_terminal_risk_features(df: pd.DataFrame, delay: int = TERMINAL_DELAY_DAYS,
+                               windows=WINDOWS_DAYS) -> pd.DataFrame:
+    """Transaction count and fraud rate per terminal over a window that ends `delay` days ago."""
+    delay_s = delay * SECONDS_PER_DAY
+    engine = SortedWindows(df["TERMINAL_ID"], _epoch_seconds(df["TX_DATETIME"]),
+                           delay_s + max(windows) * SECONDS_PER_DAY)
+    fraud = df["TX_FRAUD"].to_numpy()
+    delay_count, delay_fraud = engine.aggregate(fraud, delay_s)
+    for w in windows:
+        count, n_fraud = engine.aggregate(fraud, delay_s + w * SECONDS_PER_DAY)
+        count, n_fraud = count - delay_count, n_fraud - delay_fraud
+        df[f"TERMINAL_ID_NB_TX_{w}DAY_WINDOW"] = count
+        df[f"TERMINAL_ID_RISK_{w}DAY_WINDOW"] = np.where(count > 0, n_fraud / np.maximum(count, 1), 0.0)
+    return df
@@ -0,0 +1,212 @@
+import heapq
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import List, Optional
+
+TOP_K = 5
+TOP_CUSTOMERS = 10
+AMOUNT_EDGES = np.array([0, 100, 500, 1000, 5000, 10000, np.inf])
+AMOUNT_LABELS = ["<100", "100-500", "500-1000", "1000-5000", "5000-10000", "10k+"]
+LABELS = ["Fraud", "Not Fraud"]
+# Identifiers are numeric but meaningless in a correlation matrix.
+ID_COLUMNS = {"TRANSACTION_ID", "CUSTOMER_ID", "TERMINAL_ID"}
+
+
+class BatchStats:
+    """Single-pass, mergeable accumulator for the batch fraud KPIs.
+
+    Feed result chunks with `update()` (or combine accumulators built on
+    separate chunks with `merge()`); `summary()` returns the KPIs. Counts,
+    modes, top-K rows and amount-range counts are exact regardless of how
+    the data was split. Means and the correlation matrix use Welford / Chan
+    updates, so they agree with a one-piece pass up to float rounding.
+
+    Top rows are ordered by probability, ties broken by the lower row index
+    (the index of the frames passed to `update`), so the result never
+    depends on chunk order.
+    """
+
+    def __init__(self, top_k: int = TOP_K):
+        self.top_k = top_k
+        self.n = 0
+        self.label_counts = Counter()
+        self.fraud_n = 0
+        self.fraud_amount_mean = 0.0
+        self.fraud_hours = Counter()
+        self.fraud_weekdays = Counter()
+        self.amount_ranges = np.zeros((len(AMOUNT_LABELS), len(LABELS)), dtype=np.int64)
+        self.customer_fraud = Counter()
+        # Min-heap of (probability, -row_index, row) holding the current top K.
+        self._top: List[tuple] = []
+        self.columns: Optional[List[str]] = None
+        self.cov_n = 0
+        self.mean: Optional[np.ndarray] = None
+        self.comoment: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_frame(cls, results_df: pd.DataFrame, top_k: int = TOP_K) -> "BatchStats":
+        stats = cls(top_k)
+        stats.update(results_df)
+        return stats
+
+    # --- Accumulation ---
+    def update(self, chunk: pd.DataFrame) -> "BatchStats":
+        if chunk.empty:
+            return self
+        labels = chunk["prediction_label"].to_numpy()
+        is_fraud = labels == "Fraud"
+        amounts = chunk["TX_AMOUNT"].to_numpy(dtype=np.float64)
+
+        self.n += len(chunk)
+        self.label_counts.update(pd.Series(labels).value_counts().to_dict())
+
+        # --- Fraud amount mean (Chan merge of the chunk mean) ---
+        n_b = int(is_fraud.sum())
+        if n_b:
+            mean_b = amounts[is_fraud].mean()
+            total = self.fraud_n + n_b
+            self.fraud_amount_mean += (mean_b - self.fraud_amount_mean) * n_b / total
+            self.fraud_n = total
+
+        # --- Fraud hour / weekday counters (actual values, so out-of-range input is kept) ---
+        if "TX_HOUR" in chunk.columns:
+            self.fraud_hours.update(chunk.loc[is_fraud, "TX_HOUR"].value_counts().to_dict())
+        if "TX_WEEKDAY" in chunk.columns:
+            self.fraud_weekdays.update(chunk.loc[is_fraud, "TX_WEEKDAY"].value_counts().to_dict())
+
+        # --- Amount ranges ([0, 100], (100, 500], ... like pd.cut(include_lowest=True)) ---
+        bins = np.searchsorted(AMOUNT_EDGES, amounts, side="left") - 1
+        bins[amounts == AMOUNT_EDGES[0]] = 0
+        valid = bins >= 0
+        label_idx = np.where(is_fraud, 0, 1)
+        np.add.at(self.amount_ranges, (bins[valid], label_idx[valid]), 1)
+
+        if "CUSTOMER_ID" in chunk.columns:
+            self.customer_fraud.update(chunk.loc[is_fraud, "CUSTOMER_ID"].value_counts().to_dict())
+
+        self._update_top(chunk)
+        self._update_covariance(chunk)
+        return self
+
+    def _update_top(self, chunk: pd.DataFrame):
+        proba = chunk["fraud_probability"].to_numpy(dtype=np.float64)
+        index = chunk.index.to_numpy()
+        if len(proba) > self.top_k:
+            # Keep every row tied with the k-th largest so the tie-break sees all of them.
+            kth = np.partition(proba, len(proba) - self.top_k)[len(proba) - self.top_k]
+            candidates = np.flatnonzero(proba >= kth)
+        else:
+            candidates = np.arange(len(proba))
+        order = candidates[np.lexsort((index[candidates], -proba[candidates]))][:self.top_k]
+        for pos in order:
+            self._push((proba[pos], -index[pos], chunk.iloc[pos].to_dict() | {"_row": index[pos]}))
+
+    def _push(self, item: tuple):
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, item)
+        elif item[:2] > self._top[0][:2]:
+            heapq.heapreplace(self._top, item)
+
+    def _update_covariance(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            numeric = chunk.select_dtypes(include=["int64", "float64"]).columns
+            self.columns = [c for c in numeric if c not in ID_COLUMNS]
+            k = len(self.columns)
+            self.mean, self.comoment = np.zeros(k), np.zeros((k, k))
+        if len(self.columns) < 2:
+            return
+        x = chunk[self.columns].to_numpy(dtype=np.float64)
+        x = x[~np.isnan(x).any(axis=1)]
+        if not len(x):
+            return
+        mean_b = x.mean(axis=0)
+        centered = x - mean_b
+        self._merge_moments(len(x), mean_b, centered.T @ centered)
+
+    def _merge_moments(self, n_b: int, mean_b: np.ndarray, comoment_b: np.ndarray):
+        n = self.cov_n + n_b
+        delta = mean_b - self.mean
+        self.comoment += comoment_b + np.outer(delta, delta) * (self.cov_n * n_b / n)
+        self.mean += delta * (n_b / n)
+        self.cov_n = n
+
+    def merge(self, other: "BatchStats") -> "BatchStats":
+        """Fold another accumulator (e.g. from a parallel worker) into this one."""
+        self.n += other.n
+        self.label_counts.update(other.label_counts)
+        if other.fraud_n:
+            total = self.fraud_n + other.fraud_n
+            self.fraud_amount_mean += (other.fraud_amount_mean - self.fraud_amount_mean) * other.fraud_n / total
+            self.fraud_n = total
+        self.fraud_hours += other.fraud_hours
+        self.fraud_weekdays += other.fraud_weekdays
+        self.amount_ranges += other.amount_ranges
+        self.customer_fraud.update(other.customer_fraud)
+        for item in other._top:
+            self._push(item)
+
+        if other.columns is not None:
+            if self.columns is None:
+                self.columns = list(other.columns)
+                self.mean, self.comoment = np.zeros(len(self.columns)), np.zeros((len(self.columns),) * 2)
+            if other.columns != self.columns:
+                raise ValueError("Cannot merge statistics over different numeric columns.")
+            if other.cov_n:
+                self._merge_moments(other.cov_n, other.mean, other.comoment)
+        return self
+
+    # --- Results ---
+    def top_rows(self) -> pd.DataFrame:
+        items = sorted(self._top, reverse=True)
+        rows = [item[2] for item in items]
+        if not rows:
+            return pd.DataFrame()
+        index = [row.pop("_row") for row in rows]
+        return pd.DataFrame(rows, index=index)
+
+    def correlation(self) -> Optional[pd.DataFrame]:
+        if self.columns is None or len(self.columns) < 2 or self.cov_n < 2:
+            return None
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.comoment / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def summary(self) -> dict:
+        """KPIs in the shape the batch page and PDF report render."""
+        fraud_any = self.fraud_n > 0
+
+        def mode(counter: Counter):
+            # Most frequent value, smallest on ties, like Series.mode()[0].
+            # Uploaded CSVs may hold text here, so numbers rank before text on ties.
+            if not fraud_any or not counter:
+                return "-"
+            value = min(counter.items(), key=lambda kv: (-kv[1], 0, kv[0], "") if pd.api.types.is_number(kv[0])
+                        else (-kv[1], 1, 0, str(kv[0])))[0]
+            if pd.api.types.is_number(value) and float(value).is_integer():
+                return int(value)
+            return value
+        counts = pd.Series(self.label_counts, dtype="int64")
+        counts = counts[counts > 0].sort_values(ascending=False, kind="stable")
+        counts.index.name = "prediction_label"
+
+        top_customers = None
+        if self.customer_fraud:
+            top = sorted(self.customer_fraud.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_CUSTOMERS]
+            top_customers = pd.Series(dict(top), dtype="int64")
+
+        return {
+            "fraud_pct": self.fraud_n / self.n * 100 if self.n else 0,
+            "avg_fraud_amt": self.fraud_amount_mean if fraud_any else 0,
+            "common_hour": mode(self.fraud_hours),
+            "common_day": mode(self.fraud_weekdays),
+            "top_frauds": self.top_rows(),
+            "counts": counts,
+            "top_customers": top_customers,
+            "fraud_by_range": pd.DataFrame(
+                self.amount_ranges, columns=LABELS,
+                index=pd.CategoricalIndex(AMOUNT_LABELS, categories=AMOUNT_LABELS, ordered=True, name="AmountRange"),
+            ),
+            "corr": self.correlation(),
+        }
@@ -0,0 +1,312 @@
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+BASELINE_PATH = "benchmarks/baseline.json"
+DEFAULT_SIZES = [1, 1_000, 100_000, 1_000_000]
+# Largest input each benchmark runs at; explanations and reports are too slow beyond these.
+SIZE_CAPS = {
+    "explain_frame": 1_000,
+    "batch_pdf": 100_000,
+    "single_pdf": 1,
+}
+# Each benchmark repeats until it has run this long (and at least MIN_REPEATS times).
+MIN_SECONDS = 1.0
+MIN_REPEATS = 3
+MAX_REPEATS = 50
+DEFAULT_TOLERANCE = 0.25
+# Timings below this are too noisy to call a regression.
+NOISE_FLOOR_SECONDS = 0.001
+
+
+# ---------------------------
+# Generated data
+# ---------------------------
+def generate_transactions(n_rows: int, seed: int = 42, n_days: int = 30) -> pd.DataFrame:
+    """Raw transactions shaped like the simulator output."""
+    rng = np.random.default_rng(seed)
+    seconds = np.sort(rng.integers(0, n_days * 86_400, n_rows))
+    n_customers = max(n_rows // 50, 1)
+    n_terminals = max(n_rows // 20, 1)
+    return pd.DataFrame({
+        "TRANSACTION_ID": np.arange(n_rows),
+        "TX_DATETIME": pd.Timestamp("2018-04-01") + pd.to_timedelta(seconds, unit="s"),
+        "CUSTOMER_ID": rng.integers(0, n_customers, n_rows),
+        "TERMINAL_ID": rng.integers(0, n_terminals, n_rows),
+        "TX_AMOUNT": np.round(rng.gamma(2.0, 30.0, n_rows), 2),
+        "TX_TIME_SECONDS": seconds,
+        "TX_TIME_DAYS": seconds // 86_400,
+        "TX_FRAUD": (rng.random(n_rows) < 0.01).astype(np.int64),
+        "TX_FRAUD_SCENARIO": np.zeros(n_rows, dtype=np.int64),
+    })
+
+def generate_features(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Unencoded model input (the batch upload format) derived from generated transactions."""
+    from src.feature_engineering import add_features
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = add_features(generate_transactions(n_rows, seed))
+    from src.scoring import FEATURE_ORDER
+    return df[FEATURE_ORDER].assign(TX_AMOUNT_BIN=df["TX_AMOUNT_BIN"].astype(str))
+
+def generate_results(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Frame shaped like the batch page's results_df."""
+    rng = np.random.default_rng(seed)
+    tx = generate_transactions(n_rows, seed)
+    proba = rng.beta(0.5, 8.0, n_rows)
+    return pd.DataFrame({
+        "TX_AMOUNT": tx["TX_AMOUNT"].to_numpy(),
+        "TX_HOUR": tx["TX_DATETIME"].dt.hour.to_numpy(),
+        "TX_WEEKDAY": tx["TX_DATETIME"].dt.weekday.to_numpy(),
+        "fraud_probability": proba,
+        "prediction": (proba > 0.5).astype(np.int64),
+        "prediction_label": np.where(proba > 0.5, "Fraud", "Not Fraud"),
+        "TX_DATETIME": tx["TX_DATETIME"].to_numpy(),
+        "CUSTOMER_ID": tx["CUSTOMER_ID"].to_numpy(),
+    })
+
+
+# ---------------------------
+# Model
+# ---------------------------
+class Context:
+    """Model, encoders and explainer shared by all benchmarks, loaded once."""
+
+    def __init__(self):
+        self._assets = None
+        self._explainer = None
+        self.model_source = None
+        # Teardown callbacks for temp files created by benchmark setups.
+        self.cleanup = []
+
+    def assets(self):
+        if self._assets is None:
+            from src.scoring import MODEL_PATH, read_assets
+
+            if os.path.exists(MODEL_PATH):
+                model, encoders, _, threshold = read_assets()
+                self.model_source = f"{MODEL_PATH} ({type(model).__name__})"
+            else:
+                model, encoders, threshold = _synthetic_model()
+                self.model_source = "synthetic"
+            self._assets = (model, encoders, threshold)
+        return self._assets
+
+    def explainer(self):
+        if self._explainer is None:
+            import shap
+            import joblib
+            from src.scoring import MODEL_PATH
+
+            self.assets()
+            model = joblib.load(MODEL_PATH)["model"] if self.model_source != "synthetic" else self._assets[0]
+            self._explainer = shap.Explainer(model)
+        return self._explainer
+
+def _synthetic_model():
+    """Small forest fitted on generated data, used when no trained model is present."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+    from src.scoring import preprocess_input
+
+    print("⚠️ No trained model found, benchmarking a synthetic forest.")
+    df = generate_features(20_000, seed=7)
+    encoders = {col: LabelEncoder().fit(df[col]) for col in ["TX_TIME_SECONDS", "TX_TIME_DAYS", "TX_AMOUNT_BIN"]}
+    X = preprocess_input(df, encoders)
+    y = generate_transactions(20_000, seed=7)["TX_FRAUD"].to_numpy()
+    model = RandomForestClassifier(n_estimators=50, max_depth=12, random_state=0, n_jobs=1).fit(X, y)
+    return model, encoders, 0.5
+
+
+# ---------------------------
+# Benchmarks
+# ---------------------------
+# Each setup returns a zero-argument callable; setup time is not measured.
+def _bench_preprocess(ctx: Context, n: int) -> Callable:
+    from src.scoring import preprocess_input
+    _, encoders, _ = ctx.assets()
+    df = generate_features(n)
+    return lambda: preprocess_input(df, encoders)
+
+def _bench_predict_proba(ctx: Context, n: int) -> Callable:
+    from src.scoring import preprocess_input
+    model, encoders, _ = ctx.assets()
+    X = preprocess_input(generate_features(n), encoders)
+    return lambda: model.predict_proba(X)
+
+def _bench_explain(ctx: Context, n: int) -> Callable:
+    from src.scoring import preprocess_input
+    from src.explanations import explain_frame
+    _, encoders, _ = ctx.assets()
+    explainer = ctx.explainer()
+    X = preprocess_input(generate_features(n), encoders)
+    # No ShapCache: every call pays for the explanation, like a first request.
+    return lambda: explain_frame(explainer, X, cache=None)
+
+def _bench_batch_pdf(ctx: Context, n: int) -> Callable:
+    from src.pdf_report import write_batch_report
+    from src.charts import fingerprint
+    results = generate_results(n)
+    out_path = os.path.join(tempfile.gettempdir(), "fraud_benchmark_report.pdf")
+
+    def run():
+        # A fresh key per call so chart rendering is measured, not the PNG cache.
+        write_batch_report(results, out_path, key=fingerprint(time.perf_counter_ns()))
+    return run
+
+def _bench_single_pdf(ctx: Context, n: int) -> Callable:
+    from app_pages.batch_prediction import generate_detailed_single_pdf
+    row = generate_features(1).iloc[0].to_dict()
+    shap_values = {k: 0.01 * i for i, k in enumerate(row)}
+    rng = np.random.default_rng(0)
+    # Random probabilities keep the gauge PNG cache from short-circuiting the render.
+    return lambda: generate_detailed_single_pdf(row, float(rng.random()), "Fraud", shap_values)
+
+def _bench_load_transactions(ctx: Context, n: int) -> Callable:
+    from src.data_loader import load_all_transaction_data
+    data_dir = tempfile.mkdtemp(prefix="fraud_benchmark_")
+    df = generate_transactions(n)
+    for day, part in df.groupby(df["TX_DATETIME"].dt.strftime("%Y-%m-%d")):
+        part.to_pickle(os.path.join(data_dir, f"{day}.pkl"))
+    missing_store = os.path.join(data_dir, "no_store")
+    ctx.cleanup.append(lambda: shutil.rmtree(data_dir, ignore_errors=True))
+    return lambda: load_all_transaction_data(data_dir, store_dir=missing_store)
+
+def _bench_add_features(ctx: Context, n: int) -> Callable:
+    from src.feature_engineering import add_features
+    raw = generate_transactions(n)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            add_features(raw.copy())
+    return run
+
+BENCHMARKS: Dict[str, Callable] = {
+    "preprocess_input": _bench_preprocess,
+    "predict_proba": _bench_predict_proba,
+    "explain_frame": _bench_explain,
+    "batch_pdf": _bench_batch_pdf,
+    "single_pdf": _bench_single_pdf,
+    "load_all_transaction_data": _bench_load_transactions,
+    "add_features": _bench_add_features,
+}
+
+
+def time_call(fn: Callable, min_seconds: float = MIN_SECONDS) -> dict:
+    fn()  # warm-up: imports, lazy caches, first-touch allocations
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < MIN_REPEATS or (time.perf_counter() - started < min_seconds and len(timings) < MAX_REPEATS):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return {
+        "median_s": float(np.median(timings)),
+        "min_s": float(np.min(timings)),
+        "repeats": len(timings),
+    }
+
+def run_benchmarks(sizes=DEFAULT_SIZES, only=None, min_seconds: float = MIN_SECONDS) -> dict:
+    ctx = Context()
+    results = {}
+    try:
+        for name, setup in BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            for n in sizes:
+                if n > SIZE_CAPS.get(name, n):
+                    continue
+                key = f"{name}/{n}"
+                try:
+                    results[key] = time_call(setup(ctx, n), min_seconds)
+                except ImportError as e:
+                    print(f"⚠️ Skipping {key}: {e}")
+                    continue
+                print(f"⏱️ {key:<36} median {results[key]['median_s'] * 1000:>10.2f} ms "
+                      f"({results[key]['repeats']} runs)")
+    finally:
+        for fn in ctx.cleanup:
+            fn()
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "model": ctx.model_source,
+        },
+        "results": results,
+    }
+
+def compare(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Return the benchmarks whose median slowed down by more than `tolerance`."""
+    if baseline["meta"].get("model") != current["meta"].get("model"):
+        print(f"⚠️ Model differs: baseline {baseline['meta'].get('model')}, current {current['meta'].get('model')}")
+
+    regressions = []
+    for key in sorted(set(baseline["results"]) & set(current["results"])):
+        old, new = baseline["results"][key]["median_s"], current["results"][key]["median_s"]
+        ratio = new / old if old else float("inf")
+        regressed = ratio > 1 + tolerance and new - old > NOISE_FLOOR_SECONDS
+        flag = "❌" if regressed else "✅"
+        print(f"{flag} {key:<36} {old * 1000:>10.2f} ms -> {new * 1000:>10.2f} ms ({ratio:.2f}x)")
+        if regressed:
+            regressions.append(key)
+    for key in sorted(set(baseline["results"]) - set(current["results"])):
+        print(f"⚠️ {key} is missing from the current run")
+    return regressions
+
+
+def _save(report: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Benchmark results saved to: {path}")
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the scoring, preprocessing, explanation and reporting hot paths.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Run the benchmarks and write a JSON report.")
+    run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    run.add_argument("--min-seconds", type=float, default=MIN_SECONDS)
+    run.add_argument("--out", default=BASELINE_PATH)
+    cmp_ = sub.add_parser("compare", help="Flag regressions of a report against a baseline.")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--baseline", default=BASELINE_PATH)
+    cmp_.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                      help="Allowed slowdown as a fraction of the baseline median (0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        _save(run_benchmarks(args.sizes, args.only, args.min_seconds), args.out)
+        return 0
+
+    regressions = compare(_load(args.baseline), _load(args.current), args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import io
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+from src.pipeline_cache import PipelineCache
+
+# Memory budget for rendered chart PNGs shared by every session and report.
+CHART_CACHE_MAX_BYTES = int(os.environ.get("FRAUD_CHART_CACHE_MB", "64")) * 1024 * 1024
+
+# Above this many rows the timeline is drawn as a binned density grid instead of a scatter.
+DENSITY_MIN_ROWS = int(os.environ.get("FRAUD_DENSITY_MIN_ROWS", "20000"))
+DENSITY_BINS = (120, 40)
+
+_cache = PipelineCache(CHART_CACHE_MAX_BYTES)
+
+
+def fingerprint(*parts) -> str:
+    """Content hash of frames, arrays or plain values, used to key rendered charts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render_png(draw, figsize=(4, 3)) -> bytes:
+    """Draw onto a standalone Agg figure (no pyplot state) and return PNG bytes."""
+    # Imported here so pages only pay for matplotlib when a chart is drawn.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def cached_png(key: str, name: str, draw, figsize=(4, 3)) -> bytes:
+    """Render chart `name` for data fingerprint `key` once; later calls reuse the PNG."""
+    return _cache.get_or_compute(key, f"{name}:{figsize}", lambda: render_png(draw, figsize))
+
+
+def pdf_image(png: bytes, width: int, height: int):
+    """ReportLab flowable backed by the same PNG bytes shown on screen."""
+    from reportlab.platypus import Image
+
+    return Image(io.BytesIO(png), width=width, height=height)
+
+
+# --- Batch charts ---
+def fraud_counts_png(key: str, counts: pd.Series) -> bytes:
+    def draw(fig):
+        ax = fig.subplots()
+        ax.bar(counts.index, counts.values, color=["red", "green"])
+        ax.set_ylabel("Count")
+        ax.set_title("Fraud vs Non-Fraud")
+    return cached_png(key, "fraud_counts", draw)
+
+def _stacked_bars(ax, edges, stacks, labels, colors=None, alpha=0.7):
+    """Draw pre-binned counts, so drawing cost depends on the bin count only."""
+    bottom = np.zeros(len(edges) - 1)
+    for i, (counts, label) in enumerate(zip(stacks, labels)):
+        ax.bar(edges[:-1], counts, width=np.diff(edges), bottom=bottom, align="edge",
+               label=label, alpha=alpha, color=None if colors is None else colors[i])
+        bottom = bottom + counts
+
+def probability_hist_png(key: str, proba) -> bytes:
+    # Binning happens inside draw() so a cached chart skips it too.
+    def draw(fig):
+        counts, edges = np.histogram(np.asarray(proba, dtype=np.float64), bins=20)
+        ax = fig.subplots()
+        _stacked_bars(ax, edges, [counts], [None], colors=["blue"])
+        ax.set_xlabel("Fraud Probability")
+        ax.set_ylabel("Frequency")
+        ax.set_title("Fraud Probability Distribution")
+    return cached_png(key, "probability_hist", draw)
+
+def _edges(values: np.ndarray, n_bins: int) -> np.ndarray:
+    lo, hi = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+    if hi <= lo:
+        hi = lo + 1.0
+    return np.linspace(lo, hi, n_bins + 1)
+
+def density_grid(x: np.ndarray, y: np.ndarray, is_fraud: np.ndarray, bins=DENSITY_BINS):
+    """Count rows per (x, y) cell separately for non-fraud and fraud on shared edges."""
+    x_edges, y_edges = _edges(x, bins[0]), _edges(y, bins[1])
+    grids = [
+        np.histogram2d(x[mask], y[mask], bins=(x_edges, y_edges))[0]
+        for mask in (~is_fraud, is_fraud)
+    ]
+    return grids, x_edges, y_edges
+
+def timeline_png(key: str, datetimes, amounts, is_fraud) -> bytes:
+    is_fraud = np.asarray(is_fraud, dtype=bool)
+    if len(is_fraud) > DENSITY_MIN_ROWS:
+        return _timeline_density_png(key, datetimes, amounts, is_fraud)
+
+    def draw(fig):
+        ax = fig.subplots()
+        ax.scatter(datetimes, amounts, c=is_fraud, cmap="coolwarm", alpha=0.6)
+        ax.set_title("Transactions Timeline (Fraud vs Non-Fraud)")
+        ax.set_ylabel("TX_AMOUNT")
+        ax.set_xlabel("TX_DATETIME")
+    return cached_png(key, "timeline", draw, figsize=(6, 3))
+
+def _timeline_density_png(key: str, datetimes, amounts, is_fraud) -> bytes:
+    """Time x amount heatmaps for non-fraud and fraud; cost depends on the grid size, not the rows."""
+    def draw(fig):
+        from matplotlib.colors import LogNorm
+
+        # Times are binned as int64 nanoseconds; only the bin edges become dates.
+        times = pd.to_datetime(datetimes).to_numpy().astype("datetime64[ns]")
+        known = ~np.isnat(times)  # rows with unparseable time offsets have no place on the axis
+        x = times[known].astype(np.int64).astype(np.float64)
+        y = np.asarray(amounts, dtype=np.float64)[known]
+        grids, x_edges, y_edges = density_grid(x, y, is_fraud[known])
+        x_dates = pd.to_datetime(x_edges.astype(np.int64)).to_pydatetime()
+
+        axes = fig.subplots(1, 2, sharey=True)
+        for ax, grid, title, cmap in zip(axes, grids, ["Not Fraud", "Fraud"], ["Blues", "Reds"]):
+            counts = np.ma.masked_equal(grid.T, 0)
+            if counts.count():
+                mesh = ax.pcolormesh(x_dates, y_edges, counts, cmap=cmap, norm=LogNorm())
+                fig.colorbar(mesh, ax=ax, label="Transactions")
+            ax.set_title(f"{title} ({int(grid.sum()):,})")
+            ax.set_xlabel("TX_DATETIME")
+            ax.tick_params(axis="x", labelrotation=30)
+        axes[0].set_ylabel("TX_AMOUNT")
+    return cached_png(key, "timeline_density", draw, figsize=(9, 3.5))
+
+def amount_hist_png(key: str, amounts, is_fraud) -> bytes:
+    def draw(fig):
+        values = np.asarray(amounts, dtype=np.float64)
+        fraud = np.asarray(is_fraud, dtype=bool)
+        edges = np.histogram_bin_edges(values, bins=30)
+        fraud_counts = np.histogram(values[fraud], bins=edges)[0]
+        other_counts = np.histogram(values[~fraud], bins=edges)[0]
+        ax = fig.subplots()
+        _stacked_bars(ax, edges, [fraud_counts, other_counts], ["Fraud", "Not Fraud"])
+        ax.legend()
+        ax.set_title("Fraud vs Non-Fraud Amount Distribution")
+    return cached_png(key, "amount_hist", draw, figsize=(5, 3))
+
+def correlation_png(key: str, corr: pd.DataFrame) -> bytes:
+    def draw(fig):
+        ax = fig.subplots()
+        cax = ax.matshow(corr, cmap="coolwarm")
+        ax.set_xticks(range(len(corr.columns)), corr.columns, rotation=90)
+        ax.set_yticks(range(len(corr.columns)), corr.columns)
+        fig.colorbar(cax)
+    return cached_png(key, "correlation", draw, figsize=(6, 4))
+
+
+# --- Single-transaction charts ---
+def gauge_png(prob: float) -> bytes:
+    def draw(fig):
+        ax = fig.subplots()
+        ax.barh([0], [prob], color="red" if prob > 0.5 else "green")
+        ax.set_xlim(0, 1)
+        ax.set_yticks([])
+        ax.set_xlabel("Fraud Probability")
+        ax.set_title("Fraud Risk Gauge")
+    return cached_png(fingerprint(round(prob, 6)), "gauge", draw, figsize=(3, 1.5))
+
+def shap_bar_png(shap_values: dict) -> bytes:
+    features, values = list(shap_values.keys()), list(shap_values.values())
+
+    def draw(fig):
+        ax = fig.subplots()
+        ax.barh(features, values, color="blue")
+        ax.set_title("Feature Impact (SHAP values)")
+        ax.set_xlabel("Impact")
+    return cached_png(fingerprint(features, values), "shap_bar", draw)
@@ -0,0 +1,101 @@
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from glob import glob
+from typing import List, Optional
+from tqdm import tqdm
+
+DATA_FOLDER = "data"
+STORE_DIR = "processed/transactions"
+PARTITION_COL = "TX_DATE"
+
+# Partition values are stored as "YYYY-MM-DD" strings, so range predicates
+# compare lexicographically in the same order as the dates themselves.
+_PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COL, pa.string())]), flavor="hive")
+
+
+def store_dir_for(data_dir: str) -> str:
+    """Store location for a raw data folder: `processed/transactions` next to it."""
+    return os.path.join(os.path.dirname(os.path.normpath(data_dir)), STORE_DIR)
+
+
+def has_columnar_store(store_dir: str = STORE_DIR) -> bool:
+    return bool(glob(os.path.join(store_dir, f"{PARTITION_COL}=*", "*.parquet")))
+
+
+def list_store_days(store_dir: str = STORE_DIR) -> List[str]:
+    parts = glob(os.path.join(store_dir, f"{PARTITION_COL}=*"))
+    return sorted(os.path.basename(p).split("=", 1)[1] for p in parts)
+
+
+def write_day_partition(df: pd.DataFrame, day: str, store_dir: str = STORE_DIR):
+    """Write (or overwrite) the partition for a single day."""
+    part_dir = os.path.join(store_dir, f"{PARTITION_COL}={day}")
+    if os.path.isdir(part_dir):
+        shutil.rmtree(part_dir)
+    os.makedirs(part_dir, exist_ok=True)
+    df.to_parquet(os.path.join(part_dir, "part-0.parquet"), index=False)
+
+
+def convert_pickles_to_store(data_dir: str = DATA_FOLDER, store_dir: str = STORE_DIR) -> int:
+    """One-time conversion of the daily `YYYY-MM-DD.pkl` files into the partitioned store."""
+    files = sorted(glob(os.path.join(data_dir, "*.pkl")))
+    if not files:
+        raise ValueError(f"No .pkl files found in directory: {data_dir}")
+
+    converted = 0
+    for file in tqdm(files, desc="Converting files"):
+        day = os.path.splitext(os.path.basename(file))[0]
+        try:
+            df = pd.read_pickle(file)
+        except Exception as e:
+            print(f"⚠️ Error reading {file}: {e}")
+            continue
+        write_day_partition(df, day, store_dir)
+        converted += 1
+
+    print(f"💾 Converted {converted} files into: {store_dir}")
+    return converted
+
+
+def load_transactions(
+    store_dir: str = STORE_DIR,
+    columns: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read the store, projecting `columns` and keeping days in [start_date, end_date]."""
+    if not has_columnar_store(store_dir):
+        raise FileNotFoundError(f"Columnar store not found: {store_dir}")
+
+    dataset = ds.dataset(store_dir, format="parquet", partitioning=_PARTITIONING)
+
+    predicate = None
+    if start_date is not None:
+        predicate = ds.field(PARTITION_COL) >= pd.Timestamp(start_date).strftime("%Y-%m-%d")
+    if end_date is not None:
+        upper = ds.field(PARTITION_COL) <= pd.Timestamp(end_date).strftime("%Y-%m-%d")
+        predicate = upper if predicate is None else predicate & upper
+
+    if columns is not None:
+        columns = [c for c in columns if c != PARTITION_COL]
+        missing = [c for c in columns if c not in dataset.schema.names]
+        if missing:
+            raise KeyError(f"Columns {missing} missing in columnar store: {store_dir}")
+    table = dataset.to_table(columns=columns, filter=predicate)
+    df = table.to_pandas()
+    if columns is None and PARTITION_COL in df.columns:
+        df.drop(columns=[PARTITION_COL], inplace=True)
+
+    # Partitions are already in date order; only sort if discovery order disagreed.
+    if "TX_DATETIME" in df.columns and not df["TX_DATETIME"].is_monotonic_increasing:
+        df.sort_values("TX_DATETIME", inplace=True, kind="stable")
+        df.reset_index(drop=True, inplace=True)
+
+    return df
+
+
+if __name__ == "__main__":
+    convert_pickles_to_store(DATA_FOLDER, STORE_DIR)
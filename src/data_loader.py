@@ -1,13 +1,41 @@
 import pandas as pd
 import os
+import threading
+from collections import OrderedDict
 from glob import glob
-from typing import List
+from typing import List, Optional
+
+from src.columnar_store import has_columnar_store, load_transactions, store_dir_for
+
+def load_all_transaction_data(
+    data_dir: str,
+    columns: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    store_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    # Prefer the partitioned columnar store built from `data_dir` (see
+    # `store_dir_for`): it reads only the requested columns and days.
+    store_dir = store_dir_for(data_dir) if store_dir is None else store_dir
+    if has_columnar_store(store_dir):
+        # TX_DATETIME is always read so rows come back in time order, as from the pickles.
+        read_columns = None if columns is None else [c for c in columns if c != "TX_DATETIME"] + ["TX_DATETIME"]
+        df = load_transactions(store_dir, columns=read_columns, start_date=start_date, end_date=end_date)
+        if columns is not None and "TX_DATETIME" not in columns:
+            df.drop(columns=["TX_DATETIME"], inplace=True)
+        return df
 
-def load_all_transaction_data(data_dir: str) -> pd.DataFrame:
     if not os.path.isdir(data_dir):
         raise FileNotFoundError(f"Directory not found: {data_dir}")
 
     all_files: List[str] = sorted(glob(os.path.join(data_dir, "*.pkl")))
+    if start_date is not None or end_date is not None:
+        start = pd.Timestamp(start_date).strftime("%Y-%m-%d") if start_date else ""
+        end = pd.Timestamp(end_date).strftime("%Y-%m-%d") if end_date else "9999-12-31"
+        all_files = [
+            f for f in all_files
+            if start <= os.path.splitext(os.path.basename(f))[0] <= end
+        ]
 
     if not all_files:
         raise ValueError(f"No .pkl files found in directory: {data_dir}")
@@ -18,11 +46,19 @@ def load_all_transaction_data(data_dir: str) -> pd.DataFrame:
         df = pd.read_pickle(file)
         if "TX_DATETIME" not in df.columns:
             raise KeyError(f"'TX_DATETIME' column missing in file: {file}")
+        if columns is not None:
+            missing = [c for c in columns if c not in df.columns]
+            if missing:
+                raise KeyError(f"Columns {missing} missing in file: {file}")
+            keep = [c for c in columns if c != "TX_DATETIME"]
+            df = df[keep + ["TX_DATETIME"]]
         df_list.append(df)
 
     combined_df = pd.concat(df_list, ignore_index=True)
-    combined_df.sort_values("TX_DATETIME", inplace=True)
+    combined_df.sort_values("TX_DATETIME", inplace=True, kind="stable")
     combined_df.reset_index(drop=True, inplace=True)
+    if columns is not None and "TX_DATETIME" not in columns:
+        combined_df.drop(columns=["TX_DATETIME"], inplace=True)
 
     return combined_df
 
@@ -30,4 +66,93 @@ def list_raw_files(folder):
     return sorted([f for f in os.listdir(folder) if f.endswith(".pkl")])
 
 def load_raw_data(path):
-    return pd.read_pickle(path)
\ No newline at end of file
+    return pd.read_pickle(path)
+
+# ---------------------------
+# Cached per-file loading
+# ---------------------------
+PROFILE_SUFFIX = ".profile"
+FILE_CACHE_MAX_BYTES = int(os.environ.get("FRAUD_FILE_CACHE_MB", "1024")) * 1024 * 1024
+
+def profile_frame(df: pd.DataFrame) -> dict:
+    """Column dtypes, non-null counts and describe() output for the viewer."""
+    return {
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "non_null_counts": df.notnull().sum(),
+        "describe": df.describe(include="all").transpose(),
+        "memory_bytes": int(df.memory_usage(deep=True).sum()),
+    }
+
+def _file_key(path: str) -> tuple:
+    stats = os.stat(path)
+    return os.path.abspath(path), stats.st_mtime_ns, stats.st_size
+
+def load_profile(path: str) -> dict | None:
+    """Read the persisted sidecar profile if it still matches the file on disk."""
+    profile_path = path + PROFILE_SUFFIX
+    if not os.path.exists(profile_path):
+        return None
+    try:
+        saved = pd.read_pickle(profile_path)
+    except Exception:
+        return None
+    _, mtime_ns, size = _file_key(path)
+    if saved.get("mtime_ns") != mtime_ns or saved.get("size") != size:
+        return None
+    # Profiles saved before the key rename are rebuilt.
+    if "non_null_counts" not in saved["profile"]:
+        return None
+    return saved["profile"]
+
+def save_profile(path: str, profile: dict):
+    _, mtime_ns, size = _file_key(path)
+    try:
+        pd.to_pickle({"mtime_ns": mtime_ns, "size": size, "profile": profile}, path + PROFILE_SUFFIX)
+    except OSError as e:
+        print(f"⚠️ Could not write profile for {path}: {e}")
+
+class FileFrameCache:
+    """LRU cache of loaded frames and profiles keyed on (path, mtime, size).
+
+    Entries are evicted oldest-first once their combined in-memory size
+    exceeds `max_bytes`; a frame larger than the budget is returned but not kept.
+    """
+
+    def __init__(self, max_bytes: int = FILE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str):
+        key = _file_key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0], entry[1]
+
+        df = load_raw_data(path)
+        profile = load_profile(path)
+        if profile is None:
+            profile = profile_frame(df)
+            save_profile(path, profile)
+
+        nbytes = profile["memory_bytes"]
+        with self._lock:
+            # Drop stale versions of the same file before inserting.
+            for old_key in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self._bytes -= self._entries.pop(old_key)[2]
+            if nbytes <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (df, profile, nbytes)
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+        return df, profile
+
+_FILE_CACHE = FileFrameCache()
+
+def load_raw_data_with_profile(path: str):
+    """Cached load of one raw file plus its profile; instant on revisits."""
+    return _FILE_CACHE.get(path)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+UNKNOWN_CODE = -1
+
+
+class CompiledEncoder:
+    """Sorted-array lookup table built once from a fitted LabelEncoder.
+
+    A value's label code is its position in `LabelEncoder.classes_`.
+    Lookups use `np.searchsorted` over the classes in sorted order instead
+    of a Python dict; `codes` maps a sorted position back to the original
+    code when that order differs from `classes_`.
+
+    Object classes that are all numbers (the notebook fits the time
+    encoders on object columns of ints) are compared as numbers, so they
+    keep their numeric order and match int or float inputs alike.
+    """
+
+    def __init__(self, classes: np.ndarray, codes: np.ndarray | None = None):
+        # copy=False keeps read-only memory-mapped class arrays shared.
+        if not isinstance(classes, np.ndarray):
+            classes = np.asarray(classes)
+        if classes.dtype.kind in "OUS":
+            as_numbers = pd.to_numeric(pd.Series(classes), errors="coerce").to_numpy(dtype=np.float64)
+            if len(classes) and not np.isnan(as_numbers).any() and len(np.unique(as_numbers)) == len(classes):
+                classes = as_numbers
+        self.numeric = np.issubdtype(classes.dtype, np.number)
+        if self.numeric:
+            classes = classes.astype(np.float64, copy=False)
+        elif classes.dtype.kind != "U":
+            classes = classes.astype(str)
+        if codes is None:
+            codes = np.arange(len(classes))
+
+        if len(classes) > 1 and not np.all(classes[:-1] <= classes[1:]):
+            order = np.argsort(classes, kind="stable")
+            classes, codes = classes[order], np.asarray(codes)[order]
+        self.classes = classes
+        # None when sorted positions already are the codes (the usual case).
+        self.codes = None if np.array_equal(codes, np.arange(len(classes))) else np.asarray(codes, dtype=np.int64)
+
+    @classmethod
+    def from_label_encoder(cls, le) -> "CompiledEncoder":
+        return cls(le.classes_)
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def transform(self, values) -> np.ndarray:
+        """Map values to label codes; unknown values map to -1."""
+        series = pd.Series(values, dtype=object)
+        known = series.notna().to_numpy()
+        if self.numeric:
+            vals = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+        else:
+            # Via an object array: a null would otherwise size the string dtype for every row.
+            vals = series.astype(str).to_numpy(dtype=object).astype(str)
+
+        if len(self.classes) == 0:
+            return np.full(len(vals), UNKNOWN_CODE, dtype=np.int64)
+
+        pos = np.searchsorted(self.classes, vals)
+        pos_clipped = np.minimum(pos, len(self.classes) - 1)
+        hit = (self.classes[pos_clipped] == vals) & known
+        codes = pos_clipped if self.codes is None else self.codes[pos_clipped]
+        return np.where(hit, codes, UNKNOWN_CODE).astype(np.int64)
+
+
+def compile_encoders(encoders: dict) -> Dict[str, CompiledEncoder]:
+    """Compile a {column: LabelEncoder} mapping; already compiled entries are kept."""
+    compiled = {}
+    for col, le in encoders.items():
+        if isinstance(le, CompiledEncoder):
+            compiled[col] = le
+        else:
+            compiled[col] = CompiledEncoder.from_label_encoder(le)
+    return compiled
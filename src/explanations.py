@@ -0,0 +1,110 @@
+import math
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+DEFAULT_CACHE_ROWS = 50_000
+# Bounds on rows per explainer call when a batch is split across workers:
+# below MIN_CHUNK_ROWS a thread costs more than it saves, CHUNK_ROWS caps memory per call.
+MIN_CHUNK_ROWS = 50
+CHUNK_ROWS = 2_000
+
+
+class ShapCache:
+    """Thread-safe LRU cache of SHAP rows keyed on the encoded feature vector."""
+
+    def __init__(self, max_rows: int = DEFAULT_CACHE_ROWS):
+        self.max_rows = max_rows
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return row
+
+    def put(self, key: bytes, row: np.ndarray):
+        with self._lock:
+            self._rows[key] = row
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.max_rows:
+                self._rows.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+
+def _positive_class(values: np.ndarray) -> np.ndarray:
+    """Reduce explainer output to one column per feature toward Fraud=1."""
+    if values.ndim == 3:
+        return values[:, :, 1] if values.shape[2] > 1 else values[:, :, 0]
+    return values
+
+
+def _shap_matrix(explainer, X: np.ndarray, columns) -> np.ndarray:
+    return _positive_class(np.asarray(explainer(pd.DataFrame(X, columns=columns)).values))
+
+
+def explain_frame(explainer, processed_df: pd.DataFrame, cache: Optional[ShapCache] = None,
+                  workers: int = 1, chunk_rows: int = CHUNK_ROWS,
+                  min_chunk_rows: int = MIN_CHUNK_ROWS) -> pd.DataFrame:
+    """TreeSHAP values for every row of an encoded frame, toward Fraud=1.
+
+    Identical rows are explained once; rows already in `cache` are not
+    explained again. With `workers` > 1 the remaining unique rows are split
+    evenly across the threads (between `min_chunk_rows` and `chunk_rows`
+    per slice); batches too small to split go through the explainer in one call.
+    """
+    columns = list(processed_df.columns)
+    # The model sees float32 inputs, so rows equal in float32 share an explanation.
+    X = np.ascontiguousarray(processed_df.to_numpy(dtype=np.float32))
+    out = np.zeros(X.shape, dtype=np.float64)
+    if len(X) == 0:
+        return pd.DataFrame(out, index=processed_df.index, columns=columns)
+
+    row_view = X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+    _, first_idx, inverse = np.unique(row_view, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+
+    unique_vals = np.zeros((len(first_idx), X.shape[1]), dtype=np.float64)
+    todo = []
+    for u, i in enumerate(first_idx):
+        cached = cache.get(row_view[i].tobytes()) if cache is not None else None
+        if cached is None:
+            todo.append(u)
+        else:
+            unique_vals[u] = cached
+
+    if todo:
+        todo = np.asarray(todo)
+        X_todo = X[first_idx[todo]]
+        size = min(chunk_rows, max(min_chunk_rows, math.ceil(len(X_todo) / max(workers, 1))))
+        if workers > 1 and len(X_todo) > size:
+            chunks = [X_todo[s:s + size] for s in range(0, len(X_todo), size)]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(lambda c: _shap_matrix(explainer, c, columns), chunks))
+            computed = np.vstack(parts)
+        else:
+            computed = _shap_matrix(explainer, X_todo, columns)
+
+        unique_vals[todo] = computed
+        if cache is not None:
+            for u, row in zip(todo, computed):
+                cache.put(row_view[first_idx[u]].tobytes(), row.copy())
+
+    out[:] = unique_vals[inverse]
+    return pd.DataFrame(out, index=processed_df.index, columns=columns)
@@ -1,42 +1,161 @@
 import pandas as pd
 import numpy as np
 import os
+import json
+import argparse
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from tqdm import tqdm
 
+from src.columnar_store import (
+    has_columnar_store, list_store_days, load_transactions, store_dir_for, write_day_partition
+)
+from src.aggregations import (
+    AMOUNT_BINS, AMOUNT_LABELS, LOOKBACK_DAYS, add_customer_window_features, add_entity_count,
+    add_terminal_risk_features, customer_window_columns, terminal_window_columns
+)
+
 warnings.filterwarnings("ignore")
 
 DATA_FOLDER = "data"
 OUTPUT_FILE = "processed/feature_engineered_df.pkl"
+# Incremental mode: per-day feature partitions, the per-customer TX_COUNT
+# aggregate and a manifest of the day partitions already processed.
+FEATURE_STORE_DIR = "processed/features"
+CUSTOMER_COUNTS_FILE = "processed/customer_tx_counts.pkl"
+MANIFEST_FILE = "processed/feature_manifest.json"
+# Pre-aggregated counts the Feature Engineered Data page renders from.
+SUMMARY_FILE = "processed/feature_summary.pkl"
+SUMMARY_PREVIEW_ROWS = 100
+SUMMARY_AMOUNT_BINS = [0, 10, 50, 100, 500, 1000, 5000, 10000, float("inf")]
+SUMMARY_AMOUNT_LABELS = ["0-10", "10-50", "50-100", "100-500", "500-1k", "1k-5k", "5k-10k", "10k+"]
 START_DATE = "2018-04-01"
 END_DATE = "2018-09-30"
+# Number of processes used to decode day files; 1 reads them serially in-process.
+INGEST_WORKERS = int(os.environ.get("FRAUD_INGEST_WORKERS", "1"))
+# Narrowest safe dtype for every column of the feature-engineered dataset.
+FEATURE_SCHEMA = {
+    "TRANSACTION_ID": "int32",
+    "TX_DATETIME": "datetime64[ns]",
+    "CUSTOMER_ID": "int32",
+    "TERMINAL_ID": "int32",
+    "TX_AMOUNT": "float32",
+    "TX_TIME_SECONDS": "int32",
+    "TX_TIME_DAYS": "int16",
+    "TX_FRAUD": "uint8",
+    "TX_FRAUD_SCENARIO": "uint8",
+    "TX_HOUR": "uint8",
+    "TX_WEEKDAY": "uint8",
+    "TX_MONTH": "uint8",
+    "IS_WEEKEND": "uint8",
+    "TX_AMOUNT_BIN": "category",
+    "TX_COUNT": "int32",
+    **customer_window_columns(),
+    **terminal_window_columns(),
+}
+
+def _pack_columns(df: pd.DataFrame) -> dict:
+    """Column name -> (values, dtype to restore) for shipping a day frame out of a worker.
+
+    The simulator pickles store IDs and time offsets as object columns.
+    Numeric arrays cross the process boundary as one buffer copy, whereas
+    object columns would be rebuilt element by element in the parent, so
+    object columns holding only numbers are shipped as numbers and cast
+    back in the parent. Extension dtypes (categorical, tz-aware) are
+    shipped as Series so they survive the trip.
+    """
+    columns = {}
+    for col in df.columns:
+        values, restore = df[col], None
+        if values.dtype == object and values.notna().all():
+            numeric = pd.to_numeric(values, errors="coerce")
+            if numeric.notna().all():
+                values, restore = numeric, object
+        if isinstance(values.dtype, np.dtype) and values.dtype != object:
+            values = values.to_numpy()
+        else:
+            values = values.reset_index(drop=True)
+        columns[col] = (values, restore)
+    return columns
+
+def _unpack_column(values, restore):
+    return values if restore is None else values.astype(restore)
+
+def _unpack_frames(parts: list) -> pd.DataFrame:
+    """Concatenate packed day frames into the frame pd.concat would have built."""
+    names = list(parts[0])
+    if any(list(part) != names for part in parts):
+        frames = [pd.DataFrame({c: _unpack_column(*part[c]) for c in part}) for part in parts]
+        return pd.concat(frames, ignore_index=True)
+    combined = {}
+    for c in names:
+        pieces = [part[c] for part in parts]
+        first, restore = pieces[0]
+        if all(isinstance(v, np.ndarray) and v.dtype == first.dtype and r is restore for v, r in pieces):
+            # Join column by column: one allocation per column instead of a frame concat.
+            combined[c] = _unpack_column(np.concatenate([v for v, _ in pieces]), restore)
+        else:
+            combined[c] = pd.concat([pd.Series(_unpack_column(v, r)) for v, r in pieces], ignore_index=True)
+    return pd.DataFrame(combined)
+
+def _read_day_file(file_path: str, packed: bool = False):
+    """Returns (file_path, frame, error) so warnings are printed by the parent.
 
-def read_and_merge_pickles(data_folder: str, start_date: str, end_date: str) -> pd.DataFrame:
+    Pool workers pass packed=True to ship the frame as `_pack_columns` output.
+    """
+    if not os.path.exists(file_path):
+        return file_path, None, "missing"
+    try:
+        df = pd.read_pickle(file_path)
+        return file_path, _pack_columns(df) if packed else df, None
+    except Exception as e:
+        return file_path, None, str(e)
+
+def read_and_merge_pickles(data_folder: str, start_date: str, end_date: str, workers: int = INGEST_WORKERS) -> pd.DataFrame:
     print("📂 Reading pickle files...")
     date_range = pd.date_range(start=start_date, end=end_date, freq="D")
-    df_list = []
-
-    for date in tqdm(date_range, desc="Loading files"):
-        file_path = os.path.join(data_folder, f"{date.strftime('%Y-%m-%d')}.pkl")
-        if os.path.exists(file_path):
-            try:
-                df = pd.read_pickle(file_path)
-                df_list.append(df)
-            except Exception as e:
-                print(f"⚠️ Error reading {file_path}: {e}")
-        else:
+    file_paths = [os.path.join(data_folder, f"{date.strftime('%Y-%m-%d')}.pkl") for date in date_range]
+    parts = []
+    pooled = bool(workers and workers > 1)
+
+    if pooled:
+        # Executor.map yields in submission order, so results stay in date order.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(partial(_read_day_file, packed=True), file_paths, chunksize=4)
+            results = list(tqdm(results, total=len(file_paths), desc=f"Loading files ({workers} workers)"))
+    else:
+        results = [_read_day_file(path) for path in tqdm(file_paths, desc="Loading files")]
+
+    for file_path, part, error in results:
+        if error == "missing":
             print(f"❌ Missing file: {file_path}")
+        elif error is not None:
+            print(f"⚠️ Error reading {file_path}: {error}")
+        else:
+            parts.append(part)
 
-    if not df_list:
+    if not parts:
         raise FileNotFoundError("No pickle files were found in the specified range.")
 
-    combined_df = pd.concat(df_list, ignore_index=True)
-    print(f"\n✅ Loaded {len(df_list)} files. Combined shape: {combined_df.shape}")
+    combined_df = _unpack_frames(parts) if pooled else pd.concat(parts, ignore_index=True)
+    print(f"\n✅ Loaded {len(parts)} files. Combined shape: {combined_df.shape}")
     return combined_df
 
-def add_features(df: pd.DataFrame) -> pd.DataFrame:
-    print("⚙️ Adding new features...")
+def read_transactions(data_folder: str, start_date: str, end_date: str, store_dir: str | None = None,
+                      workers: int = INGEST_WORKERS) -> pd.DataFrame:
+    store_dir = store_dir_for(data_folder) if store_dir is None else store_dir
+    if has_columnar_store(store_dir):
+        print(f"📂 Reading columnar store: {store_dir}")
+        df = load_transactions(store_dir, start_date=start_date, end_date=end_date)
+        if df.empty:
+            raise FileNotFoundError("No partitions were found in the specified range.")
+        print(f"✅ Loaded {len(df):,} rows. Combined shape: {df.shape}")
+        return df
+    return read_and_merge_pickles(data_folder, start_date, end_date, workers=workers)
 
+def add_row_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Features that depend only on the row itself (time parts and amount bin)."""
     df["TX_DATETIME"] = pd.to_datetime(df["TX_DATETIME"])
 
     # --- Time features ---
@@ -46,34 +165,288 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
     df["IS_WEEKEND"] = df["TX_WEEKDAY"].isin([5, 6]).astype(int)
 
     # --- Amount bins ---
-    amount_bins = [-1, 10, 50, 100, 500, 1000, 5000, np.inf]
-    amount_labels = ["0-10", "10-50", "50-100", "100-500", "500-1000", "1000-5000", "5000+"]
-    df["TX_AMOUNT_BIN"] = pd.cut(df["TX_AMOUNT"], bins=amount_bins, labels=amount_labels)
+    df["TX_AMOUNT_BIN"] = pd.cut(df["TX_AMOUNT"], bins=AMOUNT_BINS, labels=AMOUNT_LABELS)
 
-    # --- Customer transaction counts ---
-    tx_counts = (
-        df.groupby("CUSTOMER_ID")["TRANSACTION_ID"]
-        .count()
-        .reset_index()
-        .rename(columns={"TRANSACTION_ID": "TX_COUNT"})
-    )
-    df = df.merge(tx_counts, on="CUSTOMER_ID", how="left")
+    return df
+
+def _fit_column(series: pd.Series, dtype: str):
+    """Return (column cast to `dtype`, None) or (None, reason it does not fit)."""
+    if dtype == "category" or np.dtype(dtype).kind == "M":
+        return series.astype(dtype), None
+
+    target = np.dtype(dtype)
+    values = series
+    if not pd.api.types.is_numeric_dtype(values):
+        # IDs can arrive as strings from the simulator pickles.
+        values = pd.to_numeric(series, errors="coerce")
+        if values.isnull().sum() > series.isnull().sum():
+            return None, f"has non-numeric values ({series.dtype})"
+
+    if target.kind in "iu":
+        if values.isnull().any():
+            return None, "contains nulls"
+        if pd.api.types.is_float_dtype(values) and not (values % 1 == 0).all():
+            return None, "has fractional values"
+        info = np.iinfo(target)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            return None, f"values {values.min()}..{values.max()} outside {dtype} range"
+    return values.astype(dtype), None
+
+def compact_dtypes(df: pd.DataFrame, schema: dict = FEATURE_SCHEMA, report: bool = True) -> pd.DataFrame:
+    """Cast every column listed in `schema` to its declared dtype.
+
+    All columns are validated before the frame is changed; a value that
+    does not fit its declared dtype raises ValueError instead of wrapping
+    around. Schema columns absent from `df` are skipped and columns without
+    a schema entry are left unchanged.
+    """
+    before = df.memory_usage(deep=True).sum() if report else 0
+    cast, problems = {}, []
+    for col, dtype in schema.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        values, reason = _fit_column(df[col], dtype)
+        if reason:
+            problems.append(f"{col} -> {dtype}: {reason}")
+        else:
+            cast[col] = values
+    if problems:
+        raise ValueError("Schema validation failed:\n  " + "\n  ".join(problems))
 
+    # Replace columns one at a time so the whole frame is never copied.
+    for col, values in cast.items():
+        df[col] = values
+
+    if report:
+        after = df.memory_usage(deep=True).sum()
+        saved = (1 - after / before) * 100 if before else 0.0
+        print(f"🗜️ Compacted dtypes: {before / 1_048_576:.1f} MB -> {after / 1_048_576:.1f} MB ({saved:.0f}% smaller)")
+        unknown = [c for c in df.columns if c not in schema]
+        if unknown:
+            print(f"⚠️ Columns not in schema (left unchanged): {unknown}")
+    return df
+
+def customer_tx_counts(df: pd.DataFrame) -> pd.Series:
+    return df.groupby("CUSTOMER_ID")["TRANSACTION_ID"].count().rename("TX_COUNT")
+
+def add_window_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Customer velocity and delayed terminal risk over 1/7/30-day windows."""
+    df = add_customer_window_features(df)
+    df = add_terminal_risk_features(df)
     return df
 
+def add_features(df: pd.DataFrame) -> pd.DataFrame:
+    print("⚙️ Adding new features...")
+
+    df = add_row_features(df)
+
+    # --- Customer transaction counts ---
+    df = add_entity_count(df, "CUSTOMER_ID", "TX_COUNT")
+
+    # --- Windowed customer / terminal features ---
+    df = add_window_features(df)
+
+    return compact_dtypes(df)
+
+def _write_pickle(obj, path: str):
+    """Pickle to a temp file and swap it in, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pd.to_pickle(obj, tmp_path)
+    os.replace(tmp_path, path)
+
 def save_processed_data(df: pd.DataFrame, output_file: str):
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df.to_pickle(output_file)
+    _write_pickle(df, output_file)
     print(f"💾 Processed data saved to: {output_file}")
 
 
+# ---------------------------
+# Aggregate summary
+# ---------------------------
+def _split_by_label(keys, label: pd.Series) -> pd.DataFrame:
+    """Counts per key split into Not Fraud / Fraud columns."""
+    counts = label.groupby(keys, observed=False).value_counts().unstack(fill_value=0)
+    counts = counts.reindex(columns=[0, 1], fill_value=0).astype("int64")
+    counts.columns = ["Not Fraud", "Fraud"]
+    return counts
+
+def build_summary(df: pd.DataFrame) -> dict:
+    """Compact counts behind every chart on the feature page.
+
+    Entity counts are kept for every customer and terminal (not just the
+    top K) so summaries of separate day batches can be merged exactly.
+    """
+    label = df["TX_FRAUD"].astype("int64") if "TX_FRAUD" in df.columns else pd.Series(0, index=df.index)
+    summary = {
+        "rows": len(df),
+        "dtypes": {str(c): str(t) for c, t in df.dtypes.items()},
+        "non_null": df.notnull().sum(),
+        "memory_bytes": int(df.memory_usage(deep=True).sum()),
+        "has_label": "TX_FRAUD" in df.columns,
+        "preview": df.head(SUMMARY_PREVIEW_ROWS).copy(),
+        "counts": {},
+    }
+    counts = summary["counts"]
+    counts["label"] = label.value_counts().reindex([0, 1], fill_value=0).astype("int64")
+    if "TX_DATETIME" in df.columns:
+        counts["daily"] = _split_by_label(pd.to_datetime(df["TX_DATETIME"]).dt.normalize().rename("TX_DATE"), label)
+    if "TX_AMOUNT" in df.columns:
+        amount_bin = pd.cut(df["TX_AMOUNT"], bins=SUMMARY_AMOUNT_BINS, labels=SUMMARY_AMOUNT_LABELS,
+                            include_lowest=True).rename("AMOUNT_BIN")
+        counts["amount_bin"] = _split_by_label(amount_bin, label)
+    for key, col in [("hourly", "TX_HOUR"), ("weekday", "TX_WEEKDAY"),
+                     ("customer", "CUSTOMER_ID"), ("terminal", "TERMINAL_ID")]:
+        if col in df.columns:
+            counts[key] = _split_by_label(df[col], label)
+    return summary
+
+def merge_summaries(a: dict, b: dict) -> dict:
+    """Combine two summaries as if built from the concatenated data."""
+    merged = {
+        "rows": a["rows"] + b["rows"],
+        "dtypes": {**a["dtypes"], **b["dtypes"]},
+        "non_null": a["non_null"].add(b["non_null"], fill_value=0).astype("int64"),
+        "memory_bytes": a["memory_bytes"] + b["memory_bytes"],
+        "has_label": a["has_label"] or b["has_label"],
+        "preview": a["preview"],
+        "counts": {},
+    }
+    for key in set(a["counts"]) | set(b["counts"]):
+        left, right = a["counts"].get(key), b["counts"].get(key)
+        if left is None or right is None:
+            merged["counts"][key] = left if right is None else right
+        else:
+            merged["counts"][key] = left.add(right, fill_value=0).astype("int64")
+    return merged
+
+def save_summary(summary: dict, summary_file: str = SUMMARY_FILE):
+    _write_pickle(summary, summary_file)
+    print(f"💾 Summary saved to: {summary_file}")
+
+def load_summary(summary_file: str = SUMMARY_FILE) -> dict:
+    return pd.read_pickle(summary_file)
+
 def load_processed_data(path: str) -> pd.DataFrame:
+    if os.path.isdir(path):
+        return load_incremental_features(path)
     return pd.read_pickle(path)
 
+# ---------------------------
+# Incremental mode
+# ---------------------------
+def _load_manifest(manifest_file: str = MANIFEST_FILE) -> dict:
+    if not os.path.exists(manifest_file):
+        return {"processed_days": []}
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_manifest(manifest: dict, manifest_file: str = MANIFEST_FILE):
+    os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+def _available_days(data_folder: str, start_date: str, end_date: str, store_dir: str | None = None) -> list:
+    store_dir = store_dir_for(data_folder) if store_dir is None else store_dir
+    start = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+    end = pd.Timestamp(end_date).strftime("%Y-%m-%d")
+    if has_columnar_store(store_dir):
+        days = list_store_days(store_dir)
+    elif os.path.isdir(data_folder):
+        days = sorted(os.path.splitext(f)[0] for f in os.listdir(data_folder) if f.endswith(".pkl"))
+    else:
+        days = []
+    return [d for d in days if start <= d <= end]
+
+def load_incremental_features(feature_dir: str = FEATURE_STORE_DIR,
+                              counts_file: str = CUSTOMER_COUNTS_FILE) -> pd.DataFrame:
+    """Load the appended day partitions and attach the current per-customer TX_COUNT."""
+    df = load_transactions(feature_dir)
+    counts = pd.read_pickle(counts_file)
+    df["TX_COUNT"] = df["CUSTOMER_ID"].map(counts).fillna(0)
+    return compact_dtypes(df, report=False)
+
+def update_features_incremental(data_folder: str = DATA_FOLDER, start_date: str = START_DATE,
+                                end_date: str = END_DATE, feature_dir: str = FEATURE_STORE_DIR,
+                                counts_file: str = CUSTOMER_COUNTS_FILE,
+                                manifest_file: str = MANIFEST_FILE,
+                                summary_file: str = SUMMARY_FILE) -> list:
+    """Process only day partitions not yet listed in the manifest.
+
+    Row features are computed for the new days and appended as new
+    partitions; the per-customer TX_COUNT aggregate is updated from the new
+    rows only and is joined back at load time, so earlier partitions never
+    need rewriting. Windowed features are computed over the new days plus
+    LOOKBACK_DAYS of earlier raw data (clamped to `start_date`, matching a
+    full rebuild) so every window is complete.
+    """
+    manifest = _load_manifest(manifest_file)
+    done = set(manifest["processed_days"])
+    new_days = [d for d in _available_days(data_folder, start_date, end_date) if d not in done]
+
+    if not new_days:
+        print("✅ Features are up to date, no new days to process.")
+        return []
+
+    # Each aggregate records the days already folded into it, so a day is
+    # never added twice when a run crashes between writing the artifacts.
+    # Artifacts from before this bookkeeping are taken to match the manifest.
+    if os.path.exists(counts_file):
+        counts = pd.read_pickle(counts_file)
+        counts_days = set(counts.attrs.get("processed_days", done))
+    else:
+        counts, counts_days = pd.Series(dtype="int64", name="TX_COUNT"), set()
+    summary, summary_days = None, set()
+    if os.path.exists(summary_file):
+        saved = load_summary(summary_file)
+        # A summary written by a full rebuild has no processed_days and is not extended.
+        if "processed_days" in saved or done:
+            summary, summary_days = saved, set(saved.get("processed_days", done))
+
+    context_start = max(pd.Timestamp(new_days[0]) - pd.Timedelta(days=LOOKBACK_DAYS), pd.Timestamp(start_date))
+    context = read_transactions(data_folder, context_start.strftime("%Y-%m-%d"), new_days[-1])
+    context = add_window_features(add_row_features(context))
+    context = compact_dtypes(context, report=False)
+    day_rows = context.groupby(context["TX_DATETIME"].dt.normalize(), sort=False).indices
+
+    appended = []
+    for day in tqdm(new_days, desc="Processing new days"):
+        rows = day_rows.get(pd.Timestamp(day))
+        if rows is None:
+            print(f"⚠️ No transactions found for {day}")
+            continue
+
+        df = context.iloc[rows].reset_index(drop=True)
+        # Rewriting a partition is idempotent.
+        write_day_partition(df, day, feature_dir)
+
+        if day not in counts_days:
+            counts = counts.add(customer_tx_counts(df), fill_value=0).astype("int64").rename("TX_COUNT")
+            counts_days.add(day)
+            counts.attrs["processed_days"] = sorted(counts_days)
+            _write_pickle(counts, counts_file)
+
+        if day not in summary_days:
+            day_summary = build_summary(df.assign(TX_COUNT=df["CUSTOMER_ID"].map(counts)))
+            summary = day_summary if summary is None else merge_summaries(summary, day_summary)
+            summary_days.add(day)
+            summary["processed_days"] = sorted(summary_days)
+            save_summary(summary, summary_file)
+
+        done.add(day)
+        manifest["processed_days"] = sorted(done)
+        _save_manifest(manifest, manifest_file)
+        appended.append(day)
+
+    print(f"💾 Appended {len(appended)} day(s) to: {feature_dir}")
+    return appended
+
 def main():
-    df = read_and_merge_pickles(DATA_FOLDER, START_DATE, END_DATE)
+    df = read_transactions(DATA_FOLDER, START_DATE, END_DATE)
     df = add_features(df)
     save_processed_data(df, OUTPUT_FILE)
+    save_summary(build_summary(df), SUMMARY_FILE)
 
     print("\n📋 Feature Summary:")
     with pd.option_context("display.max_columns", None, "display.width", 120):
@@ -81,3 +454,14 @@ def main():
 
     class_dist = df["TX_FRAUD"].value_counts(normalize=True) * 100
     print("\n🎯 Fraud Distribution (%):\n", class_dist.round(2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the feature-engineered dataset.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process day partitions that have not been processed yet.")
+    args = parser.parse_args()
+
+    if args.incremental:
+        update_features_incremental()
+    else:
+        main()
@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+DEFAULT_MAX_BATCH_ROWS = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+# Upper bound a caller waits for its result, so no request can hang forever.
+DEFAULT_RESULT_TIMEOUT_S = 30.0
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row scoring requests into one model call.
+
+    Callers `submit` one record and get a Future back. A background thread
+    collects records until `max_batch_rows` are queued or `max_wait_ms` has
+    passed since the first one arrived, scores them as a single matrix with
+    `score_fn(records) -> results` and resolves each caller's Future with its
+    own result. If a batch fails, its records are scored one at a time so
+    only the caller whose record is at fault gets the error.
+
+    `close()` scores everything submitted before it and fails any request
+    still queued afterwards; `submit` is rejected once closing has begun.
+    """
+
+    def __init__(self, score_fn: Callable[[list], list],
+                 max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        if max_batch_rows < 1:
+            raise ValueError("max_batch_rows must be at least 1")
+        self.score_fn = score_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._closed = False
+        # Orders submit() against close(), so nothing is queued behind the stop marker.
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, record) -> Future:
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((record, future))
+        return future
+
+    def score(self, record, timeout: float | None = DEFAULT_RESULT_TIMEOUT_S):
+        return self.submit(record).result(timeout=timeout)
+
+    def close(self, timeout: float | None = None):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _fail_pending(self):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("MicroBatcher closed before the request was scored"))
+
+    def _collect(self, first) -> tuple:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                # Drain whatever is already queued even after the deadline.
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+
+            records = [record for record, _ in batch]
+            try:
+                results = self.score_fn(records)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    self._score_each(batch)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        self._fail_pending()
+
+    def _score_each(self, batch: list):
+        for record, future in batch:
+            try:
+                future.set_result(self.score_fn([record])[0])
+            except Exception as e:
+                future.set_exception(e)
@@ -0,0 +1,108 @@
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+
+from src.encoders import CompiledEncoder, compile_encoders
+from src.tree_engine import CompiledForest
+
+MODEL_PATH = "models/fraud_detection_model.pkl"
+MMAP_MODEL_DIR = "models/fraud_detection_model.mmap"
+FORMAT_VERSION = 1
+
+_FOREST_ARRAYS = ("feature", "threshold", "left", "right", "missing_left", "value", "roots")
+
+
+def has_mmap_artifact(artifact_dir: str = MMAP_MODEL_DIR) -> bool:
+    return os.path.exists(os.path.join(artifact_dir, "manifest.json"))
+
+
+def export_mmap_artifact(model_path: str = MODEL_PATH, artifact_dir: str = MMAP_MODEL_DIR) -> str:
+    """Write the forest and encoder classes as plain .npy files plus a JSON manifest.
+
+    Every large array is a fixed-width dtype, so it can be memory-mapped
+    read-only and shared through the page cache by all worker processes.
+    """
+    import joblib
+
+    saved = joblib.load(model_path)
+    forest = CompiledForest.from_sklearn(saved["model"])
+    encoders = compile_encoders(saved["encoders"])
+
+    tmp_dir = f"{artifact_dir}.tmp"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    for name in _FOREST_ARRAYS:
+        np.save(os.path.join(tmp_dir, f"forest_{name}.npy"), np.ascontiguousarray(getattr(forest, name)))
+
+    encoder_files, code_files = {}, {}
+    for i, (col, enc) in enumerate(encoders.items()):
+        file_name = f"encoder_{i}.npy"
+        np.save(os.path.join(tmp_dir, file_name), np.ascontiguousarray(enc.classes))
+        encoder_files[col] = file_name
+        # Classes are stored sorted; keep the original codes when the order differs.
+        if enc.codes is not None:
+            code_files[col] = f"encoder_{i}_codes.npy"
+            np.save(os.path.join(tmp_dir, code_files[col]), np.ascontiguousarray(enc.codes))
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "source": os.path.basename(model_path),
+        "max_depth": forest.max_depth,
+        "classes": forest.classes_.tolist(),
+        "feature_names": None if forest.feature_names_in_ is None else [str(f) for f in forest.feature_names_in_],
+        "encoders": encoder_files,
+        "encoder_codes": code_files,
+        "categorical_cols": list(saved.get("categorical_cols", [])),
+    }
+    if "threshold" in saved:
+        manifest["threshold"] = float(saved["threshold"])
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the finished directory in so readers never see a partial artifact.
+    if os.path.isdir(artifact_dir):
+        shutil.rmtree(artifact_dir)
+    os.replace(tmp_dir, artifact_dir)
+    print(f"💾 Exported memory-mappable model ({len(forest.feature):,} nodes) to: {artifact_dir}")
+    return artifact_dir
+
+
+def load_mmap_artifact(artifact_dir: str = MMAP_MODEL_DIR):
+    """Return (forest, encoders, categorical_cols, manifest) backed by read-only memory maps."""
+    with open(os.path.join(artifact_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact version: {manifest.get('format_version')}")
+
+    def _map(file_name):
+        return np.load(os.path.join(artifact_dir, file_name), mmap_mode="r")
+
+    arrays = {
+        name: _map(f"forest_{name}.npy") for name in _FOREST_ARRAYS
+        # Artifacts exported before NaN routing was recorded have no missing_left.
+        if os.path.exists(os.path.join(artifact_dir, f"forest_{name}.npy"))
+    }
+    forest = CompiledForest(
+        max_depth=manifest["max_depth"],
+        classes=manifest["classes"],
+        feature_names=manifest["feature_names"],
+        **arrays,
+    )
+    code_files = manifest.get("encoder_codes", {})
+    encoders = {
+        col: CompiledEncoder(_map(file_name), _map(code_files[col]) if col in code_files else None)
+        for col, file_name in manifest["encoders"].items()
+    }
+    return forest, encoders, manifest.get("categorical_cols", []), manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the model as a memory-mappable artifact.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--out", default=MMAP_MODEL_DIR)
+    args = parser.parse_args()
+    export_mmap_artifact(args.model_path, args.out)
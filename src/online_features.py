@@ -0,0 +1,263 @@
+import os
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from src.aggregations import (
+    AMOUNT_BINS, AMOUNT_LABELS, LOOKBACK_DAYS, TERMINAL_DELAY_DAYS, WINDOWS_DAYS
+)
+
+DATA_FOLDER = "data"
+STORE_PATH = "models/online_feature_store.npz"
+# Day 0 of TX_TIME_DAYS / TX_TIME_SECONDS (first day of the simulated dataset).
+EPOCH = pd.Timestamp("2018-04-01")
+# One daily bucket per day any window can reach back to.
+RING_DAYS = LOOKBACK_DAYS + 1
+HISTORY_COLUMNS = ["CUSTOMER_ID", "TERMINAL_ID", "TX_DATETIME", "TX_AMOUNT", "TX_FRAUD"]
+_EMPTY_DAY = np.iinfo(np.int32).min
+
+
+def amount_bin(amount: float) -> str:
+    idx = int(np.searchsorted(AMOUNT_BINS, amount, side="left")) - 1
+    return AMOUNT_LABELS[min(max(idx, 0), len(AMOUNT_LABELS) - 1)]
+
+
+class EntityHistory:
+    """Daily ring buffers for one entity type, one array row per entity.
+
+    Bucket `day % ring_days` holds the transaction count, amount sum and
+    fraud count for `day`; a bucket still stamped with an older day is
+    cleared when it is reused. An update touches one bucket and a window
+    read scans `ring_days` buckets, independent of how much history exists.
+    """
+
+    ARRAYS = ("day", "tx", "amount", "fraud", "total")
+
+    def __init__(self, ring_days: int = RING_DAYS, capacity: int = 1024):
+        self.ring_days = ring_days
+        self.slots: Dict[int, int] = {}
+        self.day = np.full((capacity, ring_days), _EMPTY_DAY, dtype=np.int32)
+        self.tx = np.zeros((capacity, ring_days), dtype=np.int32)
+        self.amount = np.zeros((capacity, ring_days), dtype=np.float64)
+        self.fraud = np.zeros((capacity, ring_days), dtype=np.int32)
+        self.total = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _grow(self, needed: int):
+        capacity = len(self.total)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in self.ARRAYS:
+            old = getattr(self, name)
+            fill = _EMPTY_DAY if name == "day" else 0
+            new = np.full((new_capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, name, new)
+
+    def _slot(self, key: int) -> int:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = len(self.slots)
+            self._grow(slot + 1)
+            self.slots[key] = slot
+        return slot
+
+    def _bucket(self, slot: int, day: int) -> Optional[int]:
+        """Ring column for `day`, or None if the day is older than the ring span."""
+        if day <= int(self.day[slot].max()) - self.ring_days:
+            # Its bucket now belongs to a newer day, which must not be reset.
+            return None
+        col = day % self.ring_days
+        if self.day[slot, col] != day:
+            self.day[slot, col] = day
+            self.tx[slot, col] = 0
+            self.amount[slot, col] = 0.0
+            self.fraud[slot, col] = 0
+        return col
+
+    def add(self, key: int, day: int, amount: float, fraud: int = 0):
+        slot = self._slot(key)
+        self.total[slot] += 1
+        col = self._bucket(slot, day)
+        if col is None:
+            return
+        self.tx[slot, col] += 1
+        self.amount[slot, col] += amount
+        self.fraud[slot, col] += fraud
+
+    def add_fraud(self, key: int, day: int):
+        slot = self.slots.get(key)
+        if slot is not None and self.day[slot, day % self.ring_days] == day:
+            self.fraud[slot, day % self.ring_days] += 1
+
+    def window(self, key: int, end_day: int, n_days: int):
+        """Return (tx count, amount sum, fraud count) over days (end_day - n_days, end_day]."""
+        slot = self.slots.get(key)
+        if slot is None:
+            return 0, 0.0, 0
+        days = self.day[slot]
+        mask = (days <= end_day) & (days > end_day - n_days)
+        return int(self.tx[slot, mask].sum()), float(self.amount[slot, mask].sum()), int(self.fraud[slot, mask].sum())
+
+    def count(self, key: int) -> int:
+        slot = self.slots.get(key)
+        return 0 if slot is None else int(self.total[slot])
+
+    def to_arrays(self, prefix: str) -> dict:
+        n = len(self.slots)
+        arrays = {f"{prefix}_{name}": getattr(self, name)[:n] for name in self.ARRAYS}
+        arrays[f"{prefix}_keys"] = np.fromiter(self.slots.keys(), dtype=np.int64, count=n)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str, ring_days: int) -> "EntityHistory":
+        keys = arrays[f"{prefix}_keys"]
+        history = cls(ring_days, capacity=max(len(keys), 1))
+        for name in cls.ARRAYS:
+            getattr(history, name)[:len(keys)] = arrays[f"{prefix}_{name}"]
+        history.slots = dict(zip(keys.tolist(), range(len(keys))))
+        return history
+
+    @classmethod
+    def from_frame(cls, keys, days, amounts, fraud, ring_days: int = RING_DAYS) -> "EntityHistory":
+        """Vectorized bootstrap from historical transactions (keys/days/amounts/fraud arrays)."""
+        unique, slot_of_row = np.unique(keys, return_inverse=True)
+        history = cls(ring_days, capacity=max(len(unique), 1))
+        history.slots = dict(zip(unique.tolist(), range(len(unique))))
+        np.add.at(history.total, slot_of_row, 1)
+
+        if len(days):
+            recent = days > days.max() - ring_days
+            slots, recent_days = slot_of_row[recent], days[recent]
+            cols = recent_days % ring_days
+            history.day[slots, cols] = recent_days
+            np.add.at(history.tx, (slots, cols), 1)
+            np.add.at(history.amount, (slots, cols), amounts[recent])
+            np.add.at(history.fraud, (slots, cols), fraud[recent])
+        return history
+
+
+class OnlineFeatureStore:
+    """Per-customer and per-terminal state for deriving features at request time.
+
+    Windows use whole-day buckets, so a "7-day" window is the current day
+    plus the six before it rather than an exact 168-hour span.
+    """
+
+    def __init__(self, ring_days: int = RING_DAYS, customers: Optional[EntityHistory] = None,
+                 terminals: Optional[EntityHistory] = None):
+        self.ring_days = ring_days
+        self.customers = customers or EntityHistory(ring_days)
+        self.terminals = terminals or EntityHistory(ring_days)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _elapsed(timestamp):
+        ts = pd.Timestamp(timestamp)
+        return ts, int((ts - EPOCH).total_seconds())
+
+    def features(self, customer_id: int, terminal_id: int, timestamp, amount: float) -> dict:
+        """Model features (plus windowed history) for a transaction that has not been recorded yet."""
+        ts, seconds = self._elapsed(timestamp)
+        day = seconds // 86_400
+        customer_id, terminal_id = int(customer_id), int(terminal_id)
+
+        row = {
+            "TX_AMOUNT": float(amount),
+            "TX_TIME_SECONDS": seconds,
+            "TX_TIME_DAYS": day,
+            "TX_HOUR": ts.hour,
+            "TX_WEEKDAY": ts.weekday(),
+            "TX_MONTH": ts.month,
+            "IS_WEEKEND": int(ts.weekday() >= 5),
+            "TX_AMOUNT_BIN": amount_bin(amount),
+        }
+        with self._lock:
+            # Counts include the transaction being scored, as in the offline features.
+            row["TX_COUNT"] = self.customers.count(customer_id) + 1
+            for w in WINDOWS_DAYS:
+                n_tx, total, _ = self.customers.window(customer_id, day, w)
+                row[f"CUSTOMER_ID_NB_TX_{w}DAY_WINDOW"] = n_tx + 1
+                row[f"CUSTOMER_ID_AVG_AMOUNT_{w}DAY_WINDOW"] = (total + amount) / (n_tx + 1)
+
+            delay_tx, _, delay_fraud = self.terminals.window(terminal_id, day, TERMINAL_DELAY_DAYS)
+            for w in WINDOWS_DAYS:
+                n_tx, _, n_fraud = self.terminals.window(terminal_id, day, TERMINAL_DELAY_DAYS + w)
+                n_tx, n_fraud = n_tx - delay_tx, n_fraud - delay_fraud
+                row[f"TERMINAL_ID_NB_TX_{w}DAY_WINDOW"] = n_tx
+                row[f"TERMINAL_ID_RISK_{w}DAY_WINDOW"] = n_fraud / n_tx if n_tx > 0 else 0.0
+        return row
+
+    def update(self, customer_id: int, terminal_id: int, timestamp, amount: float, fraud: int = 0):
+        """Record a transaction (O(1))."""
+        day = self._elapsed(timestamp)[1] // 86_400
+        with self._lock:
+            self.customers.add(int(customer_id), day, float(amount))
+            self.terminals.add(int(terminal_id), day, float(amount), int(fraud))
+
+    def record_fraud(self, terminal_id: int, timestamp):
+        """Attach a fraud label that arrived after its transaction was recorded."""
+        day = self._elapsed(timestamp)[1] // 86_400
+        with self._lock:
+            self.terminals.add_fraud(int(terminal_id), day)
+
+    # --- Persistence ---
+    def snapshot(self, path: str = STORE_PATH) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            arrays = {**self.customers.to_arrays("customer"), **self.terminals.to_arrays("terminal")}
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, ring_days=np.int64(self.ring_days), **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def restore(cls, path: str = STORE_PATH) -> "OnlineFeatureStore":
+        with np.load(path) as arrays:
+            ring_days = int(arrays["ring_days"])
+            return cls(
+                ring_days,
+                customers=EntityHistory.from_arrays(arrays, "customer", ring_days),
+                terminals=EntityHistory.from_arrays(arrays, "terminal", ring_days),
+            )
+
+    @classmethod
+    def from_transactions(cls, df: pd.DataFrame, ring_days: int = RING_DAYS) -> "OnlineFeatureStore":
+        """Bootstrap from historical transactions without a per-row loop."""
+        seconds = (pd.to_datetime(df["TX_DATETIME"]) - EPOCH).dt.total_seconds().to_numpy()
+        days = (seconds // 86_400).astype(np.int64)
+        amounts = df["TX_AMOUNT"].to_numpy(dtype=np.float64)
+        fraud = df["TX_FRAUD"].to_numpy(dtype=np.int32) if "TX_FRAUD" in df.columns else np.zeros(len(df), np.int32)
+        # IDs can arrive as strings from the simulator pickles.
+        customer_ids = pd.to_numeric(df["CUSTOMER_ID"]).to_numpy(np.int64)
+        terminal_ids = pd.to_numeric(df["TERMINAL_ID"]).to_numpy(np.int64)
+        return cls(
+            ring_days,
+            customers=EntityHistory.from_frame(customer_ids, days, amounts, np.zeros(len(df), np.int32), ring_days),
+            terminals=EntityHistory.from_frame(terminal_ids, days, amounts, fraud, ring_days),
+        )
+
+
+def build_store(data_dir: str = DATA_FOLDER, path: str = STORE_PATH) -> OnlineFeatureStore:
+    from src.data_loader import load_all_transaction_data
+
+    df = load_all_transaction_data(data_dir, columns=HISTORY_COLUMNS)
+    store = OnlineFeatureStore.from_transactions(df)
+    store.snapshot(path)
+    print(f"💾 Online feature store ({len(store.customers):,} customers, "
+          f"{len(store.terminals):,} terminals) saved to: {path}")
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the online feature store snapshot from transaction history.")
+    parser.add_argument("--data-dir", default=DATA_FOLDER)
+    parser.add_argument("--out", default=STORE_PATH)
+    args = parser.parse_args()
+    build_store(args.data_dir, args.out)
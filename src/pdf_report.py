@@ -0,0 +1,113 @@
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from src.batch_stats import BatchStats
+from src.charts import fingerprint, fraud_counts_png, pdf_image, probability_hist_png
+
+# Rows per detailed-table chunk; one chunk fits on a letter page with the grid style.
+TABLE_ROWS_PER_PAGE = 40
+# Only the highest-risk rows are laid out in the PDF; the CSV export holds every row.
+REPORT_TOP_K = int(os.environ.get("FRAUD_PDF_TOP_K", "1000"))
+TABLE_HEADER = ["TX_AMOUNT", "Fraud Probability", "Prediction Label", "TX_DATETIME"]
+
+
+def format_table_rows(results_df: pd.DataFrame) -> list:
+    """Detailed-table cells built column by column instead of row by row."""
+    amount = results_df["TX_AMOUNT"].round(2).astype(str).to_numpy()
+    proba = ((results_df["fraud_probability"] * 100).round(2).astype(str) + "%").to_numpy()
+    label = results_df["prediction_label"].astype(str).to_numpy()
+    if "TX_DATETIME" in results_df.columns:
+        tx_dt = pd.to_datetime(results_df["TX_DATETIME"]).dt.strftime("%Y-%m-%d %H:%M:%S").fillna("-").to_numpy()
+    else:
+        tx_dt = np.full(len(results_df), "-", dtype=object)
+    return np.column_stack([amount, proba, label, tx_dt]).tolist()
+
+
+def table_chunks(rows: list, header: list, rows_per_page: int = TABLE_ROWS_PER_PAGE):
+    """Yield one small Table per page so ReportLab never lays out one huge table."""
+    from reportlab.platypus import Table, TableStyle
+    from reportlab.lib import colors
+
+    style = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER")
+    ])
+    for start in range(0, len(rows), rows_per_page):
+        table = Table([header] + rows[start:start + rows_per_page], repeatRows=1)
+        table.setStyle(style)
+        yield table
+
+
+def write_batch_report(results_df: pd.DataFrame, out_path: str, top_k: int = REPORT_TOP_K,
+                       key: str | None = None, stats: BatchStats | None = None) -> str:
+    """Build the batch prediction PDF straight into `out_path`.
+
+    The detailed table is capped at the `top_k` highest-risk rows and split
+    into page-sized tables; the report points to the CSV export for the rest.
+    `key` is the data fingerprint the charts were rendered under on screen,
+    so the report reuses those PNGs; `stats` is the accumulator filled while
+    scoring, so the KPIs need no further pass over the rows.
+    """
+    # Heavy report/plotting libraries are only imported when a report is built.
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    doc = SimpleDocTemplate(out_path, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    # --- Report title & timestamp ---
+    elements.append(Paragraph("Batch Fraud Prediction Report", styles["Title"]))
+    report_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    elements.append(Paragraph(f"Report Generated On: {report_date}", styles["Normal"]))
+    elements.append(Spacer(1, 12))
+
+    # --- Fraud Pattern Statistics ---
+    summary = (stats or BatchStats.from_frame(results_df)).summary()
+
+    kpi_data = [
+        ["Metric", "Value"],
+        ["% Fraudulent Transactions", f"{summary['fraud_pct'] / 100:.2%}"],
+        ["Average Fraud Amount", f"${summary['avg_fraud_amt']:,.2f}"],
+        ["Most Common Fraud Hour", summary["common_hour"]],
+        ["Most Common Fraud Day (0=Mon)", summary["common_day"]]
+    ]
+
+    kpi_table = Table(kpi_data)
+    kpi_table.setStyle(TableStyle([
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER")
+    ]))
+    elements.append(kpi_table)
+    elements.append(Spacer(1, 12))
+
+    if key is None:
+        key = fingerprint(results_df[["fraud_probability", "prediction_label"]])
+
+    # --- Fraud Count Chart ---
+    elements.append(pdf_image(fraud_counts_png(key, summary["counts"]), width=300, height=200))
+    elements.append(Spacer(1, 12))
+
+    # --- Probability Distribution Chart ---
+    elements.append(pdf_image(probability_hist_png(key, results_df["fraud_probability"]), width=300, height=200))
+
+    # --- Detailed Table ---
+    elements.append(PageBreak())
+    top_df = results_df.nlargest(top_k, "fraud_probability") if len(results_df) > top_k else results_df
+    if len(top_df) < len(results_df):
+        elements.append(Paragraph(
+            f"Showing the {len(top_df):,} highest-risk of {len(results_df):,} transactions. "
+            "Download the CSV export for the full results.", styles["Normal"]))
+        elements.append(Spacer(1, 12))
+    elements.extend(table_chunks(format_table_rows(top_df), TABLE_HEADER))
+
+    doc.build(elements)
+    return out_path
@@ -0,0 +1,107 @@
+import os
+import sys
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Memory budget for one session's cached pipeline stages.
+PIPELINE_CACHE_MAX_BYTES = int(os.environ.get("FRAUD_PIPELINE_CACHE_MB", "512")) * 1024 * 1024
+_HASH_BLOCK = 8 * 1024 * 1024
+
+
+def content_key(file, *versions) -> str:
+    """SHA-256 of an uploaded file's bytes plus any version strings (model, threshold)."""
+    digest = hashlib.sha256()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    for block in iter(lambda: file.read(_HASH_BLOCK), b""):
+        digest.update(block)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    for version in versions:
+        digest.update(str(version).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_bytes(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class PipelineCache:
+    """LRU cache of pipeline stage results keyed by (content key, stage).
+
+    Each stage (scores, aggregates, rendered charts, ...) is stored and
+    evicted on its own, so a cheap stage can be recomputed while an
+    expensive one stays cached. `on_evict(stage, value)` is called for
+    every evicted entry so stages can release on-disk files. Entries that
+    share the key of the value being stored are pinned and never evicted by
+    that store.
+    """
+
+    def __init__(self, max_bytes: int = PIPELINE_CACHE_MAX_BYTES,
+                 on_evict: Optional[Callable] = None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str, stage: str):
+        with self._lock:
+            entry = self._entries.get((key, stage))
+            if entry is None:
+                return None
+            self._entries.move_to_end((key, stage))
+            return entry[0]
+
+    def put(self, key: str, stage: str, value):
+        size = estimate_bytes(value)
+        evicted = []
+        with self._lock:
+            old = self._entries.pop((key, stage), None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[(key, stage)] = (value, size)
+            self._bytes += size
+            # Stages of the key being written are never evicted, even if they alone
+            # exceed the budget: the caller is still using them (and their files).
+            for entry_key in list(self._entries):
+                if self._bytes <= self.max_bytes:
+                    break
+                if entry_key[0] == key:
+                    continue
+                old_value, old_size = self._entries.pop(entry_key)
+                self._bytes -= old_size
+                evicted.append((entry_key[1], old_value))
+        if self.on_evict is not None:
+            for old_stage, old_value in evicted:
+                self.on_evict(old_stage, old_value)
+        return value
+
+    def get_or_compute(self, key: str, stage: str, compute: Callable):
+        value = self.get(key, stage)
+        if value is None:
+            value = self.put(key, stage, compute())
+        return value
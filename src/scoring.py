@@ -0,0 +1,101 @@
+import os
+import json
+import joblib
+import pandas as pd
+
+from src.encoders import compile_encoders
+from src.model_artifact import MMAP_MODEL_DIR, has_mmap_artifact, load_mmap_artifact
+
+MODEL_PATH = "models/fraud_detection_model.pkl"
+# Decision threshold persisted next to the model so the operating point can be tuned without retraining.
+THRESHOLD_PATH = "models/decision_threshold.json"
+DEFAULT_THRESHOLD = 0.5
+
+# ---------------------------
+# Model assets
+# ---------------------------
+def load_threshold(path: str = THRESHOLD_PATH, default: float = DEFAULT_THRESHOLD) -> float:
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return float(json.load(f)["threshold"])
+
+def save_threshold(threshold: float, path: str = THRESHOLD_PATH):
+    if not 0.0 <= threshold <= 1.0:
+        raise ValueError(f"Threshold must be between 0 and 1, got {threshold}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"threshold": float(threshold)}, f, indent=2)
+
+def _mmap_is_current(model_path: str, mmap_dir: str) -> bool:
+    if not has_mmap_artifact(mmap_dir):
+        return False
+    if not os.path.exists(model_path):
+        return True
+    # A pickle retrained after the export must not be shadowed by a stale artifact.
+    return os.path.getmtime(os.path.join(mmap_dir, "manifest.json")) >= os.path.getmtime(model_path)
+
+def read_assets(model_path: str = MODEL_PATH, threshold_path: str = THRESHOLD_PATH,
+                mmap_dir: str | None = MMAP_MODEL_DIR):
+    """Load model, compiled encoders, categorical columns and threshold (no Streamlit calls).
+
+    When an up-to-date memory-mapped artifact exists it is used instead of
+    the pickle, so worker processes share one page-cache copy of the forest.
+    """
+    if mmap_dir and _mmap_is_current(model_path, mmap_dir):
+        forest, encoders, categorical_cols, manifest = load_mmap_artifact(mmap_dir)
+        threshold = load_threshold(threshold_path, default=manifest.get("threshold", DEFAULT_THRESHOLD))
+        return forest, encoders, categorical_cols, threshold
+
+    saved = joblib.load(model_path)
+    return (
+        saved["model"],
+        compile_encoders(saved["encoders"]),
+        saved.get("categorical_cols", []),
+        load_threshold(threshold_path, default=saved.get("threshold", DEFAULT_THRESHOLD)),
+    )
+
+def model_version(model_path: str = MODEL_PATH, mmap_dir: str = MMAP_MODEL_DIR,
+                  threshold_path: str = THRESHOLD_PATH) -> str:
+    """Changes whenever the model is retrained, re-exported or its threshold is tuned."""
+    parts = []
+    for path in (model_path, os.path.join(mmap_dir, "manifest.json"), threshold_path):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(parts)
+
+# ---------------------------
+# Scoring
+# ---------------------------
+FEATURE_ORDER = [
+    "TX_AMOUNT",
+    "TX_TIME_SECONDS",
+    "TX_TIME_DAYS",
+    "TX_HOUR",
+    "TX_WEEKDAY",
+    "TX_MONTH",
+    "IS_WEEKEND",
+    "TX_AMOUNT_BIN",
+    "TX_COUNT",
+]
+
+def preprocess_input(data: pd.DataFrame, encoders: dict) -> pd.DataFrame:
+    encoders = compile_encoders(encoders)
+    present = set(data.columns)
+    data = data.reindex(columns=FEATURE_ORDER, fill_value=0)
+    for col, enc in encoders.items():
+        if col in present and col in data.columns:
+            data[col] = enc.transform(data[col].to_numpy())
+
+    return data
+
+def score(model, processed_df: pd.DataFrame, threshold: float = DEFAULT_THRESHOLD):
+    """Run the model once and derive labels from the fraud probability.
+
+    At the default threshold of 0.5 this matches `model.predict`, which picks
+    class 1 only when its probability is strictly greater than class 0's.
+    """
+    proba = model.predict_proba(processed_df)[:, 1]
+    preds = (proba > threshold).astype(int)
+    return proba, preds
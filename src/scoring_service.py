@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.micro_batcher import DEFAULT_MAX_BATCH_ROWS, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from src.model_artifact import MMAP_MODEL_DIR
+from src.scoring import FEATURE_ORDER, MODEL_PATH, THRESHOLD_PATH, preprocess_input, read_assets, score
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8502
+DEFAULT_WORKERS = int(os.environ.get("FRAUD_SERVICE_WORKERS", "8"))
+MAX_BODY_BYTES = 64 * 1024 * 1024
+# Idle keep-alive connections are closed after this many seconds.
+KEEPALIVE_TIMEOUT = float(os.environ.get("FRAUD_SERVICE_KEEPALIVE_S", "5"))
+
+
+class ScoringModel:
+    """Model, encoders and threshold kept resident for the lifetime of the service."""
+
+    def __init__(self, model_path: str = MODEL_PATH, threshold_path: str = THRESHOLD_PATH,
+                 mmap_dir: str | None = MMAP_MODEL_DIR):
+        self.model, self.encoders, self.categorical_cols, self.threshold = read_assets(
+            model_path, threshold_path, mmap_dir
+        )
+        # A forest trained with n_jobs=-1 would spin up a thread pool on every
+        # call; requests are already served concurrently by the worker pool.
+        if hasattr(self.model, "n_jobs"):
+            self.model.n_jobs = 1
+        self.model_path = model_path
+        self.model_format = type(self.model).__name__
+        self.loaded_at = time.time()
+
+    def prepare_record(self, record: dict) -> np.ndarray:
+        """Encode one record on its own, exactly as a single-row request is scored.
+
+        Missing fields get the same defaults whichever records it is later
+        batched with, and a malformed value fails here, in its caller's
+        request, instead of inside a shared batch.
+        """
+        processed_df = preprocess_input(pd.DataFrame.from_records([record]), self.encoders)
+        return processed_df.to_numpy(dtype=np.float64)[0]
+
+    def score_one(self, record: dict) -> dict:
+        return self.score_prepared([self.prepare_record(record)])[0]
+
+    def score_prepared(self, rows: list) -> list:
+        return self._results(pd.DataFrame(np.vstack(rows), columns=FEATURE_ORDER))
+
+    def score_records(self, records: list) -> list:
+        input_df = pd.DataFrame.from_records(records)
+        return self._results(preprocess_input(input_df, self.encoders))
+
+    def _results(self, processed_df: pd.DataFrame) -> list:
+        proba, preds = score(self.model, processed_df, self.threshold)
+        return [
+            {
+                "fraud_probability": float(p),
+                "prediction": int(y),
+                "prediction_label": "Fraud" if y == 1 else "Not Fraud",
+            }
+            for p, y in zip(proba, preds)
+        ]
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # Keep-alive lets upstream clients reuse connections between requests;
+    # the socket timeout ends connections that sit idle.
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length <= 0:
+            raise ValueError("Request body is empty.")
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Request body is too large.")
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self):
+        if self.path == "/health":
+            scorer = self.server.scorer
+            self._send_json(200, {
+                "status": "ok",
+                "model_path": scorer.model_path,
+                "model_format": scorer.model_format,
+                "threshold": scorer.threshold,
+                "workers": self.server.workers,
+                "uptime_seconds": round(time.time() - scorer.loaded_at, 1),
+            })
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            if self.path == "/predict":
+                if not isinstance(payload, dict):
+                    raise ValueError("Expected a single transaction object.")
+                self._send_json(200, self.server.score_one(payload))
+            elif self.path == "/predict/batch":
+                records = payload.get("transactions") if isinstance(payload, dict) else payload
+                if not isinstance(records, list) or not records:
+                    raise ValueError("Expected a non-empty list of transactions.")
+                self._send_json(200, {"results": self.server.score_records(records)})
+            else:
+                self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"Scoring failed: {e}"})
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """HTTP server with one lightweight thread per connection and a fixed-size scoring pool.
+
+    Connections (including idle keep-alive ones) never hold a scoring
+    worker; only encoding and model calls run on the `workers` pool, so
+    queueing is bounded by scoring work rather than by open connections.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, scorer: ScoringModel, workers: int = DEFAULT_WORKERS,
+                 batch_max_rows: int = DEFAULT_MAX_BATCH_ROWS, batch_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        super().__init__(address, ScoringHandler)
+        self.scorer = scorer
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scoring")
+        # Single-row requests are coalesced into one predict_proba call; a
+        # batch size of 1 disables coalescing.
+        self.batcher = None
+        if batch_max_rows > 1:
+            self.batcher = MicroBatcher(scorer.score_prepared, batch_max_rows, batch_wait_ms)
+
+    def score_records(self, records: list) -> list:
+        return self.pool.submit(self.scorer.score_records, records).result()
+
+    def score_one(self, record: dict) -> dict:
+        if self.batcher is None:
+            return self.pool.submit(self.scorer.score_one, record).result()
+        row = self.pool.submit(self.scorer.prepare_record, record).result()
+        # The model call itself runs on the batcher's thread.
+        return self.batcher.score(row)
+
+    def server_close(self):
+        super().server_close()
+        if self.batcher is not None:
+            self.batcher.close()
+        self.pool.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless fraud scoring service (HTTP/JSON).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Threads running encoding and model calls.")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--mmap-dir", default=MMAP_MODEL_DIR,
+                        help="Memory-mapped model artifact used when present; pass '' to always unpickle.")
+    parser.add_argument("--batch-max-rows", type=int, default=DEFAULT_MAX_BATCH_ROWS,
+                        help="Max single-row requests coalesced into one model call (1 disables).")
+    parser.add_argument("--batch-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Max time to wait for more requests before scoring a batch.")
+    args = parser.parse_args()
+
+    print("📦 Loading model assets...")
+    scorer = ScoringModel(args.model_path, mmap_dir=args.mmap_dir or None)
+    server = ScoringServer((args.host, args.port), scorer, workers=args.workers,
+                           batch_max_rows=args.batch_max_rows, batch_wait_ms=args.batch_wait_ms)
+    print(f"🚀 Scoring service listening on http://{args.host}:{args.port} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
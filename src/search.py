@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+ID_COLUMNS = ["TRANSACTION_ID", "CUSTOMER_ID", "TERMINAL_ID"]
+# Rows scanned per block when collecting a page of substring matches.
+BLOCK_ROWS = 50_000
+
+
+class RawDataSearchIndex:
+    """Search engine for one loaded frame.
+
+    Every column is converted to a lower-cased string column once, so a
+    text search is one vectorized `str.contains` per column. ID columns also
+    get hash indexes (value -> row positions) for exact lookups. Results are
+    paginated by scanning row blocks until the requested page is filled, so
+    the full-frame match mask is never materialized.
+    """
+
+    def __init__(self, df: pd.DataFrame, id_columns: List[str] = ID_COLUMNS):
+        self.df = df
+        self.text_columns = {col: df[col].astype(str).str.lower() for col in df.columns}
+        self.id_indexes: Dict[str, Dict[float, np.ndarray]] = {}
+        for col in id_columns:
+            if col in df.columns:
+                # IDs can arrive as strings from the simulator pickles; key every
+                # index on the numeric value so lookups use one key type.
+                keys = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+                self.id_indexes[col] = keys.groupby(keys.to_numpy(), sort=False).indices
+
+    def lookup_id(self, column: str, value) -> np.ndarray:
+        """Row positions whose `column` equals `value` exactly (O(1) hash lookup)."""
+        index = self.id_indexes.get(column)
+        if index is None:
+            raise KeyError(f"No hash index for column: {column}")
+        try:
+            key = float(str(value).strip())
+        except ValueError:
+            return np.empty(0, dtype=np.int64)
+        return np.asarray(index.get(key, np.empty(0, dtype=np.int64)))
+
+    def _block_matches(self, term: str, start: int, stop: int) -> np.ndarray:
+        mask = np.zeros(stop - start, dtype=bool)
+        for col in self.text_columns.values():
+            mask |= col.iloc[start:stop].str.contains(term, regex=False, na=False).to_numpy()
+        return np.flatnonzero(mask) + start
+
+    def search(self, term: str, offset: int = 0, limit: int = 100,
+               column: Optional[str] = None) -> Tuple[pd.DataFrame, bool]:
+        """Return (page of matching rows, whether more matches exist after it).
+
+        With `column` set to an indexed ID column the term is an exact ID;
+        otherwise it is a case-insensitive substring across all columns.
+        """
+        if column is not None:
+            positions = self.lookup_id(column, term)
+            page = positions[offset:offset + limit]
+            return self.df.iloc[page], len(positions) > offset + limit
+
+        term = term.lower()
+        wanted = offset + limit + 1  # one extra match tells us whether another page exists
+        found: List[np.ndarray] = []
+        n_found = 0
+        for start in range(0, len(self.df), BLOCK_ROWS):
+            hits = self._block_matches(term, start, min(start + BLOCK_ROWS, len(self.df)))
+            found.append(hits)
+            n_found += len(hits)
+            if n_found >= wanted:
+                break
+
+        positions = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        page = positions[offset:offset + limit]
+        return self.df.iloc[page], len(positions) > offset + limit
@@ -0,0 +1,206 @@
+import argparse
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+MODEL_PATH = "models/fraud_detection_model.pkl"
+FOREST_PATH = "models/fraud_detection_forest.npz"
+
+# Rows traversed together; bounds the (rows x trees) node index matrix.
+BLOCK_ROWS = 4096
+
+
+class CompiledForest:
+    """A random forest flattened into contiguous node arrays.
+
+    All trees share one set of arrays; `roots[t]` is the first node of tree t.
+    Leaves point to themselves with an infinite threshold, so every row can
+    be advanced `max_depth` times without per-row branching. Scoring only
+    needs NumPy, not scikit-learn. `missing_left` records which child a NaN
+    input follows at each split, as scikit-learn's trees do.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes, feature_names=None,
+                 missing_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # Forests exported before NaN routing was recorded send missing values right.
+        self.missing_left = np.zeros(len(feature), dtype=bool) if missing_left is None else missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        features, thresholds, lefts, rights, missing_lefts, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in model.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            idx = np.arange(n, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba.
+            proba = np.array(tree.value[:, 0, :], dtype=np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, idx, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, idx, tree.children_right) + offset)
+            missing_lefts.append(~is_leaf & (tree.missing_go_to_left == 1))
+            values.append(proba)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing_lefts),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            classes=model.classes_,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    def save(self, path: str = FOREST_PATH):
+        arrays = dict(
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            missing_left=self.missing_left, value=self.value, roots=self.roots, max_depth=np.asarray(self.max_depth),
+            classes=self.classes_,
+        )
+        if self.feature_names_in_ is not None:
+            arrays["feature_names"] = self.feature_names_in_.astype(str)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str = FOREST_PATH) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                feature=data["feature"], threshold=data["threshold"], left=data["left"],
+                right=data["right"], value=data["value"], roots=data["roots"],
+                max_depth=int(data["max_depth"]), classes=data["classes"],
+                feature_names=data["feature_names"] if "feature_names" in data else None,
+                missing_left=data["missing_left"] if "missing_left" in data else None,
+            )
+
+    def _as_matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is not None:
+            X = X[list(self.feature_names_in_)]
+        # scikit-learn trees compare float32 inputs against float64 thresholds.
+        return np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = self._as_matrix(X)
+        proba = np.zeros((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], BLOCK_ROWS):
+            block = slice(start, start + BLOCK_ROWS)
+            leaves = self._leaves(X[block])
+            # Accumulate tree by tree, in the same order as RandomForestClassifier.
+            acc = proba[block]
+            for t in range(leaves.shape[1]):
+                acc += self.value[leaves[:, t]]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def export_forest(model_path: str = MODEL_PATH, out_path: str = FOREST_PATH) -> CompiledForest:
+    import joblib
+
+    saved = joblib.load(model_path)
+    forest = CompiledForest.from_sklearn(saved["model"])
+    forest.save(out_path)
+    print(f"💾 Exported {forest.n_estimators} trees ({len(forest.feature):,} nodes) to: {out_path}")
+    return forest
+
+
+def random_inputs(forest: CompiledForest, n_rows: int, seed: int = 42) -> np.ndarray:
+    """Random rows spanning each feature's split thresholds, including exact threshold hits and NaNs."""
+    rng = np.random.default_rng(seed)
+    n_features = int(forest.feature.max()) + 1
+    if forest.feature_names_in_ is not None:
+        n_features = len(forest.feature_names_in_)
+    X = np.zeros((n_rows, n_features), dtype=np.float32)
+    split = np.isfinite(forest.threshold)
+    for f in range(n_features):
+        thr = forest.threshold[split & (forest.feature == f)]
+        if len(thr) == 0:
+            continue
+        lo, hi = thr.min(), thr.max()
+        pad = max(hi - lo, 1.0) * 0.1
+        X[:, f] = rng.uniform(lo - pad, hi + pad, n_rows)
+        hits = rng.random(n_rows) < 0.1
+        X[hits, f] = rng.choice(thr, hits.sum())
+        X[rng.random(n_rows) < 0.05, f] = np.nan
+    return X
+
+
+def verify_parity(model, forest: CompiledForest, X, atol: float = 0.0) -> float:
+    """Compare against the scikit-learn model; returns the max absolute difference."""
+    if forest.feature_names_in_ is not None and not isinstance(X, pd.DataFrame):
+        X = pd.DataFrame(X, columns=list(forest.feature_names_in_))
+    expected = model.predict_proba(X)
+    actual = forest.predict_proba(X)
+    max_diff = float(np.max(np.abs(expected - actual))) if len(expected) else 0.0
+    if max_diff > atol:
+        raise AssertionError(f"Compiled forest differs from the model by {max_diff:g} (atol={atol:g})")
+    if not np.array_equal(model.predict(X), forest.predict(X)):
+        raise AssertionError("Compiled forest predicts different labels than the model")
+    return max_diff
+
+
+def main(argv: Optional[list] = None):
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Export and verify the compiled tree-ensemble engine.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="Flatten the trained forest into node arrays.")
+    exp.add_argument("--model-path", default=MODEL_PATH)
+    exp.add_argument("--out", default=FOREST_PATH)
+    ver = sub.add_parser("verify", help="Check probabilities match the scikit-learn model.")
+    ver.add_argument("--model-path", default=MODEL_PATH)
+    ver.add_argument("--forest-path", default=FOREST_PATH)
+    ver.add_argument("--rows", type=int, default=20_000)
+    ver.add_argument("--atol", type=float, default=1e-12)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_forest(args.model_path, args.out)
+        return
+
+    model = joblib.load(args.model_path)["model"]
+    forest = CompiledForest.load(args.forest_path)
+    for n_rows in (1, 7, BLOCK_ROWS + 1, args.rows):
+        max_diff = verify_parity(model, forest, random_inputs(forest, n_rows), atol=args.atol)
+        print(f"✅ {n_rows:>6,} rows: max |Δp| = {max_diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
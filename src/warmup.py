@@ -0,0 +1,83 @@
+import threading
+import time
+import traceback
+
+STAGES = ("model", "explainer")
+
+_lock = threading.Lock()
+_thread = None
+_status = {stage: "pending" for stage in STAGES}
+_errors = {}
+_timings = {}
+
+
+def _set(stage: str, state: str):
+    with _lock:
+        _status[stage] = state
+
+
+def _run():
+    # Imported here so starting the warm-up never blocks the calling script.
+    from app_pages.prediction import get_explainer, load_assets
+    from src.tree_engine import CompiledForest
+
+    started = time.perf_counter()
+    _set("model", "loading")
+    try:
+        model = load_assets()[0]
+    except BaseException as e:
+        _errors["model"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+        _set("model", "failed")
+        _set("explainer", "skipped")
+        return
+    _timings["model"] = time.perf_counter() - started
+    _set("model", "ready")
+
+    if isinstance(model, CompiledForest):
+        # The explainer needs the unpickled forest; building it here would give
+        # every worker a private copy of what the memory-mapped artifact shares.
+        _set("explainer", "deferred")
+        return
+
+    started = time.perf_counter()
+    _set("explainer", "loading")
+    try:
+        explainer = get_explainer(model)
+    except BaseException as e:
+        _errors["explainer"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+        _set("explainer", "failed")
+        return
+    _timings["explainer"] = time.perf_counter() - started
+    _set("explainer", "ready" if explainer is not None else "unavailable")
+
+
+def start_warmup() -> threading.Thread:
+    """Load the model, encoders and explainer on a background thread (once per process).
+
+    With the memory-mapped artifact the explainer is deferred until an
+    explanation is actually shown.
+
+    The loaders are the same cached functions the pages call, so a page
+    visited during warm-up waits on the in-flight load instead of starting
+    another one.
+    """
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="fraud-warmup", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def warmup_status() -> dict:
+    with _lock:
+        return {
+            "stages": dict(_status),
+            "errors": dict(_errors),
+            "timings": dict(_timings),
+            "ready": all(_status[s] in ("ready", "unavailable", "deferred") for s in STAGES),
+        }
+
+
+def is_ready() -> bool:
+    return warmup_status()["ready"]
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregations import (
+    SECONDS_PER_DAY, SortedWindows, add_customer_window_features, add_terminal_risk_features
+)
+
+
+def _naive_windows(keys, times, values, window):
+    """Loop over rows; rows sharing a timestamp count up to the current row, like pandas rolling."""
+    count = np.zeros(len(keys), dtype=np.int64)
+    total = np.zeros(len(keys), dtype=np.float64)
+    rows = np.arange(len(keys))
+    for i in range(len(keys)):
+        earlier = (times < times[i]) | ((times == times[i]) & (rows <= i))
+        inside = (keys == keys[i]) & (times > times[i] - window) & earlier
+        count[i] = inside.sum()
+        total[i] = values[inside].sum()
+    return count, total
+
+
+def _transactions(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    seconds = rng.integers(0, 40 * SECONDS_PER_DAY, n)
+    # Repeat some timestamps so ties at the window edges are exercised.
+    seconds[::10] = seconds[1::10][:len(seconds[::10])]
+    return pd.DataFrame({
+        "CUSTOMER_ID": rng.integers(0, 12, n),
+        "TERMINAL_ID": rng.integers(0, 6, n),
+        "TX_DATETIME": pd.Timestamp("2018-04-01") + pd.to_timedelta(seconds, unit="s"),
+        "TX_AMOUNT": rng.uniform(1, 300, n).round(2),
+        "TX_FRAUD": (rng.random(n) < 0.2).astype(int),
+    })
+
+
+@pytest.mark.parametrize("window", [1, 3_600, SECONDS_PER_DAY, 7 * SECONDS_PER_DAY])
+def test_sorted_windows_match_naive_loop(window):
+    rng = np.random.default_rng(1)
+    keys = rng.choice(["a", "b", "c", "d"], 300)
+    times = rng.integers(0, 10 * SECONDS_PER_DAY, 300)
+    times[:20] = times[20:40]
+    values = rng.uniform(0, 10, 300)
+
+    count, total = SortedWindows(keys, times, 7 * SECONDS_PER_DAY).aggregate(values, window)
+    expected_count, expected_total = _naive_windows(keys, times, values, window)
+    np.testing.assert_array_equal(count, expected_count)
+    np.testing.assert_allclose(total, expected_total)
+
+
+def test_sorted_windows_edge_cases():
+    count, total = SortedWindows([], [], 10).aggregate([], 10)
+    assert len(count) == 0 and len(total) == 0
+    with pytest.raises(ValueError):
+        SortedWindows([1, 2], [0, 5], 10).aggregate([1.0, 1.0], 11)
+
+
+def test_customer_features_match_naive_loop():
+    df = add_customer_window_features(_transactions())
+    keys = df["CUSTOMER_ID"].to_numpy()
+    times = (df["TX_DATETIME"] - pd.Timestamp("1970-01-01")).dt.total_seconds().to_numpy()
+    for w in (1, 7, 30):
+        count, total = _naive_windows(keys, times, df["TX_AMOUNT"].to_numpy(), w * SECONDS_PER_DAY)
+        np.testing.assert_array_equal(df[f"CUSTOMER_ID_NB_TX_{w}DAY_WINDOW"], count)
+        np.testing.assert_allclose(df[f"CUSTOMER_ID_AVG_AMOUNT_{w}DAY_WINDOW"], total / count)
+
+
+def test_terminal_risk_matches_naive_loop():
+    df = add_terminal_risk_features(_transactions(), delay=7)
+    keys = df["TERMINAL_ID"].to_numpy()
+    times = (df["TX_DATETIME"] - pd.Timestamp("1970-01-01")).dt.total_seconds().to_numpy()
+    fraud = df["TX_FRAUD"].to_numpy()
+    delay_count, delay_fraud = _naive_windows(keys, times, fraud, 7 * SECONDS_PER_DAY)
+    for w in (1, 7, 30):
+        count, n_fraud = _naive_windows(keys, times, fraud, (7 + w) * SECONDS_PER_DAY)
+        count, n_fraud = count - delay_count, n_fraud - delay_fraud
+        np.testing.assert_array_equal(df[f"TERMINAL_ID_NB_TX_{w}DAY_WINDOW"], count)
+        np.testing.assert_allclose(df[f"TERMINAL_ID_RISK_{w}DAY_WINDOW"],
+                                   np.where(count > 0, n_fraud / np.maximum(count, 1), 0.0))
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.batch_stats import BatchStats
+
+
+def _results(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    proba = rng.choice(np.linspace(0, 1, 41), n)
+    return pd.DataFrame({
+        "TX_AMOUNT": rng.uniform(0, 12_000, n).round(2),
+        "TX_HOUR": rng.integers(0, 24, n),
+        "TX_WEEKDAY": rng.integers(0, 7, n),
+        "CUSTOMER_ID": rng.integers(0, 30, n),
+        "TX_COUNT": rng.integers(1, 50, n),
+        "fraud_probability": proba,
+        "prediction": (proba >= 0.5).astype("int64"),
+        "prediction_label": np.where(proba >= 0.5, "Fraud", "Not Fraud"),
+    })
+
+
+def _assert_same_summary(left, right):
+    assert left["fraud_pct"] == pytest.approx(right["fraud_pct"])
+    assert left["avg_fraud_amt"] == pytest.approx(right["avg_fraud_amt"])
+    assert left["common_hour"] == right["common_hour"]
+    assert left["common_day"] == right["common_day"]
+    pd.testing.assert_frame_equal(left["top_frauds"], right["top_frauds"])
+    pd.testing.assert_series_equal(left["counts"], right["counts"])
+    pd.testing.assert_series_equal(left["top_customers"], right["top_customers"])
+    pd.testing.assert_frame_equal(left["fraud_by_range"], right["fraud_by_range"])
+    pd.testing.assert_frame_equal(left["corr"], right["corr"], rtol=1e-9)
+
+
+def test_chunked_and_merged_match_one_pass():
+    df = _results()
+    whole = BatchStats.from_frame(df).summary()
+
+    chunked = BatchStats()
+    for start in range(0, len(df), 64):
+        chunked.update(df.iloc[start:start + 64])
+
+    # Parts merged out of order, as parallel workers would finish.
+    parts = [BatchStats.from_frame(df.iloc[start:start + 97]) for start in range(0, len(df), 97)]
+    merged = BatchStats()
+    for part in reversed(parts):
+        merged.merge(part)
+
+    _assert_same_summary(chunked.summary(), whole)
+    _assert_same_summary(merged.summary(), whole)
+
+
+def test_modes_match_pandas():
+    df = _results()
+    summary = BatchStats.from_frame(df).summary()
+    fraud = df[df["prediction_label"] == "Fraud"]
+    assert summary["common_hour"] == int(fraud["TX_HOUR"].mode()[0])
+    assert summary["common_day"] == int(fraud["TX_WEEKDAY"].mode()[0])
+
+
+def test_non_numeric_hours_do_not_break_the_summary():
+    df = _results(n=40)
+    df["TX_HOUR"] = df["TX_HOUR"].astype(object)
+    df.loc[df.index[::3], "TX_HOUR"] = "late"
+    df["TX_WEEKDAY"] = df["TX_WEEKDAY"].map(lambda d: ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][d])
+
+    summary = BatchStats.from_frame(df).summary()
+    fraud = df[df["prediction_label"] == "Fraud"]
+    assert summary["common_hour"] in set(fraud["TX_HOUR"])
+    assert summary["common_day"] == fraud["TX_WEEKDAY"].mode()[0]
+
+
+def test_no_fraud_reports_placeholders():
+    df = _results(n=20)
+    df["prediction_label"] = "Not Fraud"
+    summary = BatchStats.from_frame(df).summary()
+    assert summary["common_hour"] == "-"
+    assert summary["common_day"] == "-"
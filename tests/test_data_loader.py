@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.columnar_store import convert_pickles_to_store, store_dir_for
+from src.data_loader import PROFILE_SUFFIX, FileFrameCache, load_all_transaction_data, load_profile, profile_frame
+
+DAYS = pd.date_range("2018-04-01", periods=3, freq="D")
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    folder = tmp_path / "data"
+    folder.mkdir()
+    rng = np.random.default_rng(0)
+    for day in DAYS:
+        n = 10
+        pd.DataFrame({
+            "TX_DATETIME": day + pd.to_timedelta(rng.integers(0, 86_400, n), unit="s"),
+            "CUSTOMER_ID": rng.integers(0, 5, n),
+            "TX_AMOUNT": rng.uniform(1, 100, n),
+        }).to_pickle(folder / f"{day:%Y-%m-%d}.pkl")
+    return folder
+
+
+def test_store_is_derived_from_data_dir(data_dir):
+    assert store_dir_for(str(data_dir)) == str(data_dir.parent / "processed" / "transactions")
+    assert store_dir_for("data") == "processed/transactions"
+
+    from_pickles = load_all_transaction_data(str(data_dir), columns=["CUSTOMER_ID", "TX_AMOUNT"])
+    convert_pickles_to_store(str(data_dir), store_dir_for(str(data_dir)))
+    # The pickles go away, so the result can only come from the derived store.
+    for f in data_dir.glob("*.pkl"):
+        f.unlink()
+    from_store = load_all_transaction_data(str(data_dir), columns=["CUSTOMER_ID", "TX_AMOUNT"])
+    pd.testing.assert_frame_equal(from_store, from_pickles, check_dtype=False)
+
+
+@pytest.mark.parametrize("use_store", [False, True])
+def test_missing_column_raises_on_both_paths(data_dir, use_store):
+    if use_store:
+        convert_pickles_to_store(str(data_dir), store_dir_for(str(data_dir)))
+    with pytest.raises(KeyError, match="NOT_A_COLUMN"):
+        load_all_transaction_data(str(data_dir), columns=["CUSTOMER_ID", "NOT_A_COLUMN"])
+
+
+def test_profile_counts_non_null_values():
+    df = pd.DataFrame({"TX_AMOUNT": [1.0, None, 3.0], "NOTE": [None, None, "x"]})
+    profile = profile_frame(df)
+    assert profile["non_null_counts"].to_dict() == {"TX_AMOUNT": 2, "NOTE": 1}
+
+
+def test_profile_saved_under_old_key_is_rebuilt(tmp_path):
+    path = str(tmp_path / "2018-04-01.pkl")
+    pd.DataFrame({"TX_AMOUNT": [1.0, None]}).to_pickle(path)
+    FileFrameCache().get(path)
+    saved = pd.read_pickle(path + PROFILE_SUFFIX)
+    saved["profile"]["null_counts"] = saved["profile"].pop("non_null_counts")
+    pd.to_pickle(saved, path + PROFILE_SUFFIX)
+
+    assert load_profile(path) is None
+    _, profile = FileFrameCache().get(path)
+    assert profile["non_null_counts"]["TX_AMOUNT"] == 1
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from src.encoders import UNKNOWN_CODE, CompiledEncoder, compile_encoders
+from src.scoring import preprocess_input
+
+AMOUNT_BINS = ["0-100", "100-500", "500-1000", "1000-5000", "5000+"]
+
+
+def test_matches_label_encoder_on_strings():
+    le = LabelEncoder().fit(AMOUNT_BINS)
+    enc = CompiledEncoder.from_label_encoder(le)
+    values = ["5000+", "0-100", "100-500", "unknown"]
+    np.testing.assert_array_equal(enc.transform(values), list(le.transform(values[:3])) + [UNKNOWN_CODE])
+
+
+def test_nulls_only_affect_their_own_rows():
+    enc = CompiledEncoder.from_label_encoder(LabelEncoder().fit(AMOUNT_BINS))
+    le = LabelEncoder().fit(AMOUNT_BINS)
+    codes = enc.transform(["100-500", None, "1000-5000", np.nan])
+    expected = le.transform(["100-500", "1000-5000"])
+    np.testing.assert_array_equal(codes, [expected[0], UNKNOWN_CODE, expected[1], UNKNOWN_CODE])
+
+
+def test_null_does_not_match_a_literal_nan_class():
+    enc = CompiledEncoder(np.array(["a", "nan"]))
+    np.testing.assert_array_equal(enc.transform([None, "nan"]), [UNKNOWN_CODE, 1])
+
+
+def test_object_int_classes_keep_numeric_codes():
+    le = LabelEncoder().fit(pd.Series(range(183), dtype=object))
+    enc = CompiledEncoder.from_label_encoder(le)
+    np.testing.assert_array_equal(enc.transform([5, 9, 10, 11, 100, 150, 5.0, None, 999]),
+                                  [5, 9, 10, 11, 100, 150, 5, UNKNOWN_CODE, UNKNOWN_CODE])
+
+
+def test_unsorted_classes_map_back_to_original_codes():
+    enc = CompiledEncoder(np.array(["b", "a", "c"]))
+    np.testing.assert_array_equal(enc.transform(["a", "b", "c", "d"]), [1, 0, 2, UNKNOWN_CODE])
+
+
+def test_preprocess_input_with_blank_amount_bin():
+    encoders = compile_encoders({"TX_AMOUNT_BIN": LabelEncoder().fit(AMOUNT_BINS)})
+    df = pd.DataFrame({"TX_AMOUNT_BIN": ["100-500", None, "1000-5000"]})
+    codes = preprocess_input(df, encoders)["TX_AMOUNT_BIN"].tolist()
+    assert codes[1] == UNKNOWN_CODE
+    assert codes[0] != UNKNOWN_CODE and codes[2] != UNKNOWN_CODE
@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.explanations import MIN_CHUNK_ROWS, ShapCache, explain_frame
+
+
+class FakeExplainer:
+    """Linear stand-in for a TreeExplainer that records each call's size and thread."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, X: pd.DataFrame):
+        with self._lock:
+            self.calls.append((len(X), threading.get_ident()))
+        values = X.to_numpy(dtype=np.float64)
+        return type("Explanation", (), {"values": np.stack([-values, values * 2], axis=2)})()
+
+
+def _frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.integers(0, 1_000, (n, 4)).astype(float), columns=list("abcd"))
+
+
+@pytest.mark.parametrize("n_rows", [20, 500])
+def test_pool_matches_single_call(n_rows):
+    df = _frame(n_rows)
+    serial = explain_frame(FakeExplainer(), df)
+    pooled = explain_frame(FakeExplainer(), df, workers=4)
+    pd.testing.assert_frame_equal(pooled, serial)
+    pd.testing.assert_frame_equal(serial, df * 2)
+
+
+def test_slider_sized_batches_use_every_worker():
+    explainer = FakeExplainer()
+    explain_frame(explainer, _frame(500), workers=4)
+    assert sorted(size for size, _ in explainer.calls) == [125, 125, 125, 125]
+
+
+def test_small_batches_stay_in_one_call():
+    explainer = FakeExplainer()
+    explain_frame(explainer, _frame(MIN_CHUNK_ROWS), workers=8)
+    assert [size for size, _ in explainer.calls] == [MIN_CHUNK_ROWS]
+
+
+def test_cache_and_duplicates_skip_the_explainer():
+    df = pd.concat([_frame(30), _frame(30)], ignore_index=True)
+    cache, explainer = ShapCache(), FakeExplainer()
+    explain_frame(explainer, df, cache=cache)
+    assert [size for size, _ in explainer.calls] == [30]
+    explain_frame(explainer, df, cache=cache)
+    assert len(explainer.calls) == 1
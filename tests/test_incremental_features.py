@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import feature_engineering as fe
+
+DAYS = ["2018-04-01", "2018-04-02", "2018-04-03"]
+
+
+def _write_days(data_dir, rows_per_day=40, seed=0):
+    rng = np.random.default_rng(seed)
+    data_dir.mkdir()
+    tx_id = 0
+    for i, day in enumerate(DAYS):
+        n = rows_per_day
+        seconds = np.sort(rng.integers(0, 86_400, n)) + i * 86_400
+        df = pd.DataFrame({
+            "TRANSACTION_ID": np.arange(tx_id, tx_id + n),
+            "TX_DATETIME": pd.Timestamp(DAYS[0]) + pd.to_timedelta(seconds, unit="s"),
+            "CUSTOMER_ID": rng.integers(0, 10, n),
+            "TERMINAL_ID": rng.integers(0, 5, n),
+            "TX_AMOUNT": rng.uniform(1, 300, n).round(2),
+            "TX_TIME_SECONDS": seconds,
+            "TX_TIME_DAYS": np.full(n, i),
+            "TX_FRAUD": rng.integers(0, 2, n),
+            "TX_FRAUD_SCENARIO": np.zeros(n, dtype=int),
+        })
+        df.to_pickle(data_dir / f"{day}.pkl")
+        tx_id += n
+
+
+def _run(tmp_path):
+    return fe.update_features_incremental(
+        data_folder=str(tmp_path / "data"), start_date=DAYS[0], end_date=DAYS[-1],
+        feature_dir=str(tmp_path / "processed" / "features"),
+        counts_file=str(tmp_path / "processed" / "counts.pkl"),
+        manifest_file=str(tmp_path / "processed" / "manifest.json"),
+        summary_file=str(tmp_path / "processed" / "summary.pkl"),
+    )
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    _write_days(tmp_path / "data")
+    return tmp_path
+
+
+@pytest.mark.parametrize("fail_after", [1, 2])
+def test_crash_before_manifest_does_not_double_count(workdir, tmp_path_factory, monkeypatch, fail_after):
+    clean = tmp_path_factory.mktemp("clean")
+    _write_days(clean / "data")
+    assert _run(clean) == DAYS
+    expected_counts = pd.read_pickle(clean / "processed" / "counts.pkl")
+    expected_summary = fe.load_summary(str(clean / "processed" / "summary.pkl"))
+
+    save_manifest = fe._save_manifest
+    calls = []
+
+    def crash(manifest, manifest_file):
+        calls.append(manifest_file)
+        if len(calls) == fail_after:
+            raise KeyboardInterrupt
+        save_manifest(manifest, manifest_file)
+
+    monkeypatch.setattr(fe, "_save_manifest", crash)
+    with pytest.raises(KeyboardInterrupt):
+        _run(workdir)
+    monkeypatch.setattr(fe, "_save_manifest", save_manifest)
+
+    assert _run(workdir) == DAYS[fail_after - 1:]
+    counts = pd.read_pickle(workdir / "processed" / "counts.pkl")
+    summary = fe.load_summary(str(workdir / "processed" / "summary.pkl"))
+    pd.testing.assert_series_equal(counts.sort_index(), expected_counts.sort_index())
+    assert summary["rows"] == expected_summary["rows"]
+    pd.testing.assert_series_equal(summary["non_null"], expected_summary["non_null"])
+    assert summary["processed_days"] == DAYS
+
+
+def test_rerun_is_a_no_op(workdir):
+    assert _run(workdir) == DAYS
+    assert _run(workdir) == []
+    assert not list((workdir / "processed").glob("*.tmp"))
+
+
+def test_days_without_rows_are_not_reported(workdir):
+    empty = pd.read_pickle(workdir / "data" / f"{DAYS[0]}.pkl").iloc[:0]
+    empty.to_pickle(workdir / "data" / "2018-04-04.pkl")
+    appended = fe.update_features_incremental(
+        data_folder=str(workdir / "data"), start_date=DAYS[0], end_date="2018-04-04",
+        feature_dir=str(workdir / "processed" / "features"),
+        counts_file=str(workdir / "processed" / "counts.pkl"),
+        manifest_file=str(workdir / "processed" / "manifest.json"),
+        summary_file=str(workdir / "processed" / "summary.pkl"),
+    )
+    assert appended == DAYS
@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from src.micro_batcher import MicroBatcher
+
+
+class RecordingScorer:
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def __call__(self, records):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append(list(records))
+        if "bad" in records:
+            raise ValueError("bad record")
+        return [record * 10 for record in records]
+
+
+def test_concurrent_requests_share_one_model_call():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_rows=8, max_wait_ms=200)
+    try:
+        futures = [batcher.submit(i) for i in range(5)]
+        assert [f.result(timeout=5) for f in futures] == [0, 10, 20, 30, 40]
+    finally:
+        batcher.close()
+    assert scorer.calls == [[0, 1, 2, 3, 4]]
+
+
+def test_batches_are_capped_at_max_rows():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_rows=3, max_wait_ms=200)
+    try:
+        futures = [batcher.submit(i) for i in range(7)]
+        assert [f.result(timeout=5) for f in futures] == [i * 10 for i in range(7)]
+    finally:
+        batcher.close()
+    assert all(len(call) <= 3 for call in scorer.calls)
+
+
+def test_a_bad_record_only_fails_its_own_caller():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_rows=8, max_wait_ms=200)
+    try:
+        good, bad, other = batcher.submit(1), batcher.submit("bad"), batcher.submit(2)
+        assert good.result(timeout=5) == 10
+        assert other.result(timeout=5) == 20
+        with pytest.raises(ValueError):
+            bad.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_close_resolves_every_queued_request_and_rejects_new_ones():
+    gate = threading.Event()
+    batcher = MicroBatcher(RecordingScorer(gate), max_batch_rows=2, max_wait_ms=1)
+    futures = [batcher.submit(i) for i in range(6)]
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    gate.set()
+    closer.join(5)
+    assert not closer.is_alive()
+    assert all(f.done() for f in futures)
+    assert [f.result() for f in futures] == [i * 10 for i in range(6)]
+    with pytest.raises(RuntimeError):
+        batcher.submit(99)
+
+
+def test_requests_left_behind_the_stop_marker_fail_instead_of_hanging():
+    gate = threading.Event()
+    batcher = MicroBatcher(RecordingScorer(gate), max_batch_rows=1, max_wait_ms=1)
+    first = batcher.submit(1)
+    batcher.close(timeout=0.05)  # the worker is still blocked on the first record
+    # Simulate a request that slipped into the queue after shutdown began.
+    late = Future()
+    batcher._queue.put((2, late))
+    gate.set()
+    batcher._thread.join(5)
+    assert first.result(timeout=5) == 10
+    with pytest.raises(RuntimeError):
+        late.result(timeout=5)
@@ -0,0 +1,96 @@
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from src.model_artifact import export_mmap_artifact, load_mmap_artifact
+from src.scoring import FEATURE_ORDER, preprocess_input, read_assets
+from src.tree_engine import CompiledForest
+
+AMOUNT_BINS = ["0-100", "100-500", "500-1000", "1000-5000", "5000+"]
+CATEGORICAL = ["TX_TIME_SECONDS", "TX_TIME_DAYS", "TX_AMOUNT_BIN"]
+
+
+def _raw_rows(n, seed):
+    rng = np.random.default_rng(seed)
+    amount = rng.gamma(2.0, 60.0, n).round(2)
+    return pd.DataFrame({
+        "TX_AMOUNT": amount,
+        # The notebook fits the time encoders on object columns of ints.
+        "TX_TIME_SECONDS": pd.Series(rng.integers(0, 500, n).tolist(), dtype=object),
+        "TX_TIME_DAYS": pd.Series(rng.integers(0, 183, n).tolist(), dtype=object),
+        "TX_HOUR": rng.integers(0, 24, n),
+        "TX_WEEKDAY": rng.integers(0, 7, n),
+        "TX_MONTH": rng.integers(4, 10, n),
+        "IS_WEEKEND": rng.integers(0, 2, n),
+        "TX_AMOUNT_BIN": pd.cut(amount, [0, 100, 500, 1000, 5000, np.inf], labels=AMOUNT_BINS).astype(str),
+        "TX_COUNT": rng.integers(1, 50, n),
+    })[FEATURE_ORDER]
+
+
+@pytest.fixture(scope="module")
+def saved_model(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("model")
+    X = _raw_rows(2_000, seed=0)
+    encoders = {col: LabelEncoder().fit(X[col]) for col in CATEGORICAL}
+    X_enc = X.copy()
+    for col, le in encoders.items():
+        X_enc[col] = le.transform(X[col])
+    y = (X["TX_AMOUNT"] > 220).astype(int)
+    model = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(X_enc, y)
+    model_path = str(tmp / "model.pkl")
+    joblib.dump({"model": model, "encoders": encoders, "categorical_cols": CATEGORICAL}, model_path)
+    return model_path, model, encoders
+
+
+def test_round_trip_matches_pickle(saved_model, tmp_path):
+    model_path, model, encoders = saved_model
+    artifact_dir = export_mmap_artifact(model_path, str(tmp_path / "model.mmap"))
+    assert not os.path.exists(f"{artifact_dir}.tmp")
+    forest, compiled, categorical_cols, manifest = load_mmap_artifact(artifact_dir)
+
+    assert categorical_cols == CATEGORICAL
+    assert isinstance(forest, CompiledForest)
+    assert isinstance(forest.threshold, np.memmap) and not forest.threshold.flags.writeable
+
+    X = _raw_rows(500, seed=1)
+    for col, le in encoders.items():
+        known = X[col].isin(le.classes_).to_numpy()
+        np.testing.assert_array_equal(compiled[col].transform(X[col])[known], le.transform(X.loc[known, col]))
+
+    X_known = X[np.logical_and.reduce([X[c].isin(encoders[c].classes_) for c in CATEGORICAL])]
+    np.testing.assert_array_equal(
+        forest.predict_proba(preprocess_input(X_known, compiled)),
+        model.predict_proba(preprocess_input(X_known, encoders)),
+    )
+
+
+def test_read_assets_prefers_current_artifact(saved_model, tmp_path):
+    model_path, model, _ = saved_model
+    artifact_dir = str(tmp_path / "model.mmap")
+    export_mmap_artifact(model_path, artifact_dir)
+    threshold_path = str(tmp_path / "threshold.json")
+    assert isinstance(read_assets(model_path, threshold_path, mmap_dir=artifact_dir)[0], CompiledForest)
+
+    # A pickle retrained after the export wins over the stale artifact.
+    manifest = os.path.join(artifact_dir, "manifest.json")
+    stamp = os.path.getmtime(model_path)
+    os.utime(manifest, (stamp - 60, stamp - 60))
+    assert isinstance(read_assets(model_path, threshold_path, mmap_dir=artifact_dir)[0], RandomForestClassifier)
+
+
+def test_rejects_unknown_format_version(saved_model, tmp_path):
+    artifact_dir = export_mmap_artifact(saved_model[0], str(tmp_path / "model.mmap"))
+    manifest_path = os.path.join(artifact_dir, "manifest.json")
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest["format_version"] = 999
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    with pytest.raises(ValueError):
+        load_mmap_artifact(artifact_dir)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregations import TERMINAL_DELAY_DAYS
+from src.online_features import EPOCH, OnlineFeatureStore
+
+
+def _history(n=600, days=45, seed=0):
+    rng = np.random.default_rng(seed)
+    seconds = np.sort(rng.integers(0, days * 86_400, n))
+    return pd.DataFrame({
+        # IDs arrive as strings from the simulator pickles.
+        "CUSTOMER_ID": rng.integers(0, 20, n).astype(str),
+        "TERMINAL_ID": rng.integers(0, 8, n),
+        "TX_DATETIME": EPOCH + pd.to_timedelta(seconds, unit="s"),
+        "TX_AMOUNT": rng.uniform(1, 300, n).round(2),
+        "TX_FRAUD": (rng.random(n) < 0.15).astype(int),
+    })
+
+
+def _replay(df, store=None):
+    store = store or OnlineFeatureStore()
+    for row in df.itertuples(index=False):
+        store.update(row.CUSTOMER_ID, row.TERMINAL_ID, row.TX_DATETIME, row.TX_AMOUNT, row.TX_FRAUD)
+    return store
+
+
+def _probes(df, n=30, seed=1):
+    rng = np.random.default_rng(seed)
+    last = df["TX_DATETIME"].max()
+    return [
+        (int(rng.integers(0, 22)), int(rng.integers(0, 9)), last + pd.Timedelta(hours=int(h)), float(a))
+        for h, a in zip(rng.integers(0, 48, n), rng.uniform(1, 300, n))
+    ]
+
+
+def _assert_same_features(left, right, probes):
+    for probe in probes:
+        assert left.features(*probe) == pytest.approx(right.features(*probe))
+
+
+def test_updates_match_bootstrap():
+    df = _history()
+    _assert_same_features(_replay(df), OnlineFeatureStore.from_transactions(df), _probes(df))
+
+
+def test_window_counts_recent_days_only():
+    store = OnlineFeatureStore()
+    store.update(1, 5, EPOCH, 100.0)
+    store.update(1, 5, EPOCH + pd.Timedelta(days=3), 50.0)
+    row = store.features(1, 5, EPOCH + pd.Timedelta(days=3, hours=1), 10.0)
+    assert row["TX_COUNT"] == 3
+    assert row["CUSTOMER_ID_NB_TX_1DAY_WINDOW"] == 2
+    assert row["CUSTOMER_ID_AVG_AMOUNT_1DAY_WINDOW"] == pytest.approx(30.0)
+    assert row["CUSTOMER_ID_NB_TX_7DAY_WINDOW"] == 3
+
+
+def test_late_update_does_not_clear_newer_day():
+    store = OnlineFeatureStore()
+    now = EPOCH + pd.Timedelta(days=100)
+    store.update(1, 5, now, 10.0)
+    before = store.features(1, 5, now, 1.0)
+    # A transaction older than the ring span only counts towards TX_COUNT.
+    store.update(1, 5, now - pd.Timedelta(days=store.ring_days), 10.0)
+    after = store.features(1, 5, now, 1.0)
+    assert after["TX_COUNT"] == before["TX_COUNT"] + 1
+    assert after["CUSTOMER_ID_NB_TX_30DAY_WINDOW"] == before["CUSTOMER_ID_NB_TX_30DAY_WINDOW"]
+
+
+def test_record_fraud_updates_terminal_risk():
+    store = OnlineFeatureStore()
+    day = EPOCH + pd.Timedelta(days=10)
+    store.update(1, 5, day, 10.0)
+    # The 1-day terminal window ends TERMINAL_DELAY_DAYS before the probe.
+    probe = (1, 5, day + pd.Timedelta(days=TERMINAL_DELAY_DAYS), 10.0)
+    assert store.features(*probe)["TERMINAL_ID_RISK_1DAY_WINDOW"] == 0.0
+    store.record_fraud(5, day)
+    assert store.features(*probe)["TERMINAL_ID_RISK_1DAY_WINDOW"] == 1.0
+
+
+def test_snapshot_round_trip(tmp_path):
+    df = _history()
+    half = len(df) // 2
+    store = _replay(df.iloc[:half])
+    path = store.snapshot(str(tmp_path / "store.npz"))
+    restored = OnlineFeatureStore.restore(path)
+    assert not list(tmp_path.glob("*.tmp"))
+    assert len(restored.customers) == len(store.customers)
+    assert len(restored.terminals) == len(store.terminals)
+    _assert_same_features(restored, store, _probes(df.iloc[:half]))
+
+    # A restored store keeps accepting updates, including new entities.
+    _replay(df.iloc[half:], restored)
+    _assert_same_features(restored, _replay(df), _probes(df))
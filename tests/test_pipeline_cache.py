@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.pipeline_cache import PipelineCache, content_key
+
+
+def _value(n_bytes):
+    return np.zeros(n_bytes, dtype=np.uint8)
+
+
+def test_least_recently_used_key_is_evicted_first():
+    evicted = []
+    cache = PipelineCache(max_bytes=250, on_evict=lambda stage, value: evicted.append(stage))
+    cache.put("a", "scores", _value(100))
+    cache.put("b", "scores", _value(100))
+    assert cache.get("a", "scores") is not None  # "b" is now least recently used
+    cache.put("c", "scores", _value(100))
+    assert cache.get("b", "scores") is None
+    assert cache.get("a", "scores") is not None and cache.get("c", "scores") is not None
+    assert evicted == ["scores"]
+    assert cache.nbytes == 200
+
+
+def test_stages_of_the_active_key_are_never_evicted():
+    evicted = []
+    cache = PipelineCache(max_bytes=1000, on_evict=lambda stage, value: evicted.append(stage))
+    cache.put("old", "scores", _value(500))
+    scores = cache.put("run", "scores", _value(5000))
+    assert cache.get("old", "scores") is None
+    aggregates = cache.get_or_compute("run", "aggregates", lambda: _value(10))
+    assert cache.get("run", "scores") is scores
+    assert cache.get("run", "aggregates") is aggregates
+    assert evicted == ["scores"]  # only the other key's entry
+
+
+def test_get_or_compute_computes_once():
+    cache = PipelineCache(max_bytes=1000)
+    calls = []
+    for _ in range(3):
+        cache.get_or_compute("k", "stage", lambda: calls.append(1) or _value(1))
+    assert len(calls) == 1
+
+
+def test_content_key_depends_on_bytes_and_versions(tmp_path):
+    path = tmp_path / "upload.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+    with open(path, "rb") as f:
+        first = content_key(f, "model-1", 0.5)
+        again = content_key(f, "model-1", 0.5)
+        other_model = content_key(f, "model-2", 0.5)
+    assert first == again != other_model
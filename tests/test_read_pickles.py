@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering import read_and_merge_pickles
+
+DAYS = pd.date_range("2018-04-01", periods=5, freq="D")
+
+
+def _day_frame(i, n=25):
+    rng = np.random.default_rng(i)
+    return pd.DataFrame({
+        "TRANSACTION_ID": pd.Series(list(range(i * n, (i + 1) * n)), dtype=object),
+        "TX_DATETIME": DAYS[i] + pd.to_timedelta(np.sort(rng.integers(0, 86_400, n)), unit="s"),
+        "TX_LOCAL_TIME": (DAYS[i] + pd.to_timedelta(np.arange(n), unit="min")).tz_localize("Europe/Brussels"),
+        "CUSTOMER_ID": pd.Series(rng.integers(0, 50, n).tolist(), dtype=object),
+        "TX_AMOUNT": rng.uniform(1, 300, n),
+        "CHANNEL": pd.Categorical(rng.choice(["web", "pos"], n), categories=["web", "pos"]),
+        "NOTE": pd.Series([None if j % 7 == 0 else f"n{j}" for j in range(n)], dtype=object),
+        "TX_FRAUD": rng.integers(0, 2, n),
+    })
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    frames = [_day_frame(i) for i in range(len(DAYS))]
+    for day, df in zip(DAYS, frames):
+        df.to_pickle(tmp_path / f"{day:%Y-%m-%d}.pkl")
+    return tmp_path, pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_matches_plain_concat(data_dir, workers):
+    folder, baseline = data_dir
+    df = read_and_merge_pickles(str(folder), str(DAYS[0].date()), str(DAYS[-1].date()), workers=workers)
+    pd.testing.assert_frame_equal(df, baseline)
+
+
+def test_pooled_handles_days_with_different_dtypes(data_dir):
+    folder, _ = data_dir
+    odd = _day_frame(2)
+    odd["CUSTOMER_ID"] = odd["CUSTOMER_ID"].astype("int64")
+    odd["CHANNEL"] = pd.Categorical(odd["CHANNEL"].astype(str), categories=["pos", "web", "atm"])
+    odd.to_pickle(folder / f"{DAYS[2]:%Y-%m-%d}.pkl")
+    baseline = pd.concat([pd.read_pickle(folder / f"{d:%Y-%m-%d}.pkl") for d in DAYS], ignore_index=True)
+
+    df = read_and_merge_pickles(str(folder), str(DAYS[0].date()), str(DAYS[-1].date()), workers=2)
+    pd.testing.assert_frame_equal(df, baseline)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import search
+from src.search import RawDataSearchIndex
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 1_000
+    return pd.DataFrame({
+        # String IDs, as in the simulator pickles.
+        "TRANSACTION_ID": np.arange(n).astype(str),
+        "CUSTOMER_ID": rng.integers(0, 50, n),
+        "TERMINAL_ID": rng.integers(0, 20, n).astype(float),
+        "TX_AMOUNT": rng.uniform(1, 300, n).round(2),
+        "NOTE": rng.choice(["Card present", "ONLINE", "atm", None], n),
+    })
+
+
+def _naive_positions(df, term):
+    term = term.lower()
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        mask |= df[col].astype(str).str.lower().str.contains(term, regex=False).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize("column", ["TRANSACTION_ID", "CUSTOMER_ID", "TERMINAL_ID"])
+@pytest.mark.parametrize("value", ["7", 7, 7.0, " 7 "])
+def test_lookup_id_matches_any_representation(frame, column, value):
+    expected = np.flatnonzero(pd.to_numeric(frame[column]) == 7)
+    np.testing.assert_array_equal(np.sort(RawDataSearchIndex(frame).lookup_id(column, value)), expected)
+
+
+def test_lookup_id_misses(frame):
+    index = RawDataSearchIndex(frame)
+    assert len(index.lookup_id("CUSTOMER_ID", "abc")) == 0
+    assert len(index.lookup_id("CUSTOMER_ID", 10_000)) == 0
+    with pytest.raises(KeyError):
+        index.lookup_id("TX_AMOUNT", 1)
+
+
+@pytest.mark.parametrize("term", ["online", "Card", "1", "no-such-text"])
+def test_pages_cover_every_match_once(frame, monkeypatch, term):
+    # Small blocks so pages straddle block boundaries.
+    monkeypatch.setattr(search, "BLOCK_ROWS", 64)
+    index = RawDataSearchIndex(frame)
+    expected = _naive_positions(frame, term)
+
+    seen, offset, limit = [], 0, 37
+    while True:
+        page, more = index.search(term, offset=offset, limit=limit)
+        seen.extend(frame.index.get_indexer(page.index))
+        offset += limit
+        assert more == (len(expected) > offset)
+        if not more:
+            break
+    np.testing.assert_array_equal(seen, expected)
+
+
+def test_id_search_pagination(frame):
+    index = RawDataSearchIndex(frame)
+    expected = np.sort(index.lookup_id("CUSTOMER_ID", 3))
+    first, more = index.search("3", offset=0, limit=5, column="CUSTOMER_ID")
+    rest, more_after = index.search("3", offset=5, limit=len(expected), column="CUSTOMER_ID")
+    assert more == (len(expected) > 5)
+    assert not more_after
+    np.testing.assert_array_equal(np.sort(np.concatenate([first.index, rest.index])), expected)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.tree_engine import CompiledForest, random_inputs, verify_parity
+
+FEATURES = ["TX_AMOUNT", "TX_HOUR", "TX_WEEKDAY", "TX_COUNT"]
+
+
+def _training_data(n_rows=2_000, with_nan=False, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "TX_AMOUNT": rng.gamma(2.0, 60.0, n_rows).round(2),
+        "TX_HOUR": rng.integers(0, 24, n_rows),
+        "TX_WEEKDAY": rng.integers(0, 7, n_rows),
+        "TX_COUNT": rng.integers(1, 50, n_rows),
+    }).astype(np.float64)
+    y = ((X["TX_AMOUNT"] > 220) | ((X["TX_HOUR"] < 4) & (rng.random(n_rows) < 0.5))).astype(int)
+    if with_nan:
+        X = X.mask(rng.random(X.shape) < 0.1)
+    return X, y
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["dense", "trained_with_nan"])
+def model(request):
+    X, y = _training_data(with_nan=request.param)
+    return RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+
+def test_exact_parity_on_training_rows(model):
+    forest = CompiledForest.from_sklearn(model)
+    X, _ = _training_data(seed=1)
+    assert verify_parity(model, forest, X) == 0.0
+
+
+def test_exact_parity_on_threshold_hits_and_nan(model):
+    forest = CompiledForest.from_sklearn(model)
+    X = pd.DataFrame(random_inputs(forest, 5_000), columns=FEATURES)
+    assert X.isna().any().all()
+    assert verify_parity(model, forest, X) == 0.0
+
+
+def test_nan_follows_recorded_branch(model):
+    forest = CompiledForest.from_sklearn(model)
+    X, _ = _training_data(n_rows=200, seed=2)
+    for col in FEATURES:
+        X_nan = X.assign(**{col: np.nan})
+        np.testing.assert_array_equal(forest.predict_proba(X_nan), model.predict_proba(X_nan))
+
+
+def test_save_load_round_trip(model, tmp_path):
+    forest = CompiledForest.from_sklearn(model)
+    path = tmp_path / "forest.npz"
+    forest.save(str(path))
+    loaded = CompiledForest.load(str(path))
+    X = pd.DataFrame(random_inputs(forest, 1_000, seed=3), columns=FEATURES)
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
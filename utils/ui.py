@@ -119,16 +119,65 @@ def spinner(message: str = "Loading..."):
         yield
 
 
-def loading_bar(task_name: str = "Working...", steps: int = 6, delay: float = 0.15):
-    progress = st.progress(0)
-    status = st.empty()
-    for i in range(steps):
-        pct = int((i + 1) / steps * 100)
-        status.write(f"{task_name} {pct}%")
-        time.sleep(delay)
-        progress.progress((i + 1) / steps)
-    status.empty()
-    progress.empty()
+class StageProgress:
+    """Progress bar driven by real work instead of timed sleeps.
+
+    Each stage reports its own completion (0..1) through `update` or a
+    callback from `callback(stage)`. The bar is only drawn once the work has
+    run for `show_after` seconds, so fast operations render nothing and pay
+    no extra latency.
+    """
+
+    def __init__(self, stages, task_name: str = "Working...", show_after: float = 0.25):
+        if isinstance(stages, dict):
+            weights = dict(stages)
+        else:
+            weights = {name: 1.0 for name in stages}
+        total = sum(weights.values()) or 1.0
+        self.weights = {name: w / total for name, w in weights.items()}
+        self.done = {name: 0.0 for name in weights}
+        self.task_name = task_name
+        self.show_after = show_after
+        self.started = time.perf_counter()
+        self._bar = None
+
+    @property
+    def fraction(self) -> float:
+        return min(sum(self.weights[n] * self.done[n] for n in self.weights), 1.0)
+
+    def update(self, stage: str, fraction: float = 1.0, detail: str | None = None):
+        self.done[stage] = max(0.0, min(float(fraction), 1.0))
+        if self._bar is None:
+            if time.perf_counter() - self.started < self.show_after:
+                return
+            self._bar = st.progress(0.0)
+        text = f"{self.task_name} {stage}"
+        if detail:
+            text += f" — {detail}"
+        self._bar.progress(self.fraction, text=f"{text} ({self.fraction:.0%})")
+
+    def complete(self, stage: str):
+        self.update(stage, 1.0)
+
+    def callback(self, stage: str):
+        """Return a `fn(fraction, detail=None)` suitable for passing to long-running work."""
+        def _report(fraction: float, detail: str | None = None):
+            self.update(stage, fraction, detail)
+        return _report
+
+    def close(self):
+        if self._bar is not None:
+            self._bar.empty()
+            self._bar = None
+
+
+@contextmanager
+def stage_progress(stages, task_name: str = "Working...", show_after: float = 0.25):
+    progress = StageProgress(stages, task_name=task_name, show_after=show_after)
+    try:
+        yield progress
+    finally:
+        progress.close()
 
 
 # ---COMMON WIDGETS ---
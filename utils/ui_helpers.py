@@ -1,5 +1,4 @@
 import streamlit as st
-import time
 import pandas as pd
 
 # -------------------------------
@@ -21,22 +20,6 @@ def page_transition():
     """, unsafe_allow_html=True)
 
 
-# -------------------------------
-# Progress + Loading Animation
-# -------------------------------
-def loading_with_progress(task_name: str, steps: int = 5, delay: float = 0.3):
-    """Show a progress bar with % completion for long-running tasks."""
-    progress = st.progress(0)
-    status = st.empty()
-    for i in range(steps):
-        pct = int((i + 1) / steps * 100)
-        status.text(f"{task_name}... {pct}%")
-        time.sleep(delay)
-        progress.progress((i + 1) / steps)
-    status.success(f"✅ {task_name} complete!")
-    progress.empty()
-
-
 # ----------------------
 # DataFrame Preview
 # ----------------------